@@ -0,0 +1,34 @@
+from events import AchievementUnlocked, EnemyKilled, GoldGained, LevelUp, QuestCompleted
+
+# name -> (description, topic, condition checked when that topic fires)
+ACHIEVEMENTS = {
+    'First Victory': ("Win your first fight", EnemyKilled, lambda event: True),
+    'Wyrmbane': ("Defeat a Young Dragon", EnemyKilled, lambda event: event.enemy_type == 'dragon'),
+    'Seasoned': ("Reach level 5", LevelUp, lambda event: event.level >= 5),
+    'Legend': ("Reach level 10", LevelUp, lambda event: event.level >= 10),
+    'Wealthy': ("Hold 1000 gold at once", GoldGained, lambda event: event.player.gold >= 1000),
+    'Adventurer': ("Complete 5 quests", QuestCompleted, lambda event: len(event.player.completed_quests) >= 5),
+}
+
+
+class AchievementTracker:
+    """Unlocks achievements on a character as game events come in"""
+
+    def __init__(self, achievements=ACHIEVEMENTS):
+        self.by_topic = {}
+        for name, (description, topic, condition) in achievements.items():
+            self.by_topic.setdefault(topic, []).append((name, description, condition))
+        self.bus = None
+
+    def attach(self, bus):
+        self.bus = bus
+        for topic in self.by_topic:
+            bus.subscribe(topic, self.on_event)
+
+    def on_event(self, event):
+        player = event.player
+        for name, description, condition in self.by_topic[type(event)]:
+            if name not in player.achievements and condition(event):
+                player.achievements.append(name)
+                print(f"\n🏅 Achievement unlocked: {name} - {description}")
+                self.bus.defer(AchievementUnlocked(player, name))
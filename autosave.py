@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+
+
+class AutoSaver:
+    """Writes character snapshots to disk on a background thread.
+
+    The game thread only takes a snapshot (`Character.to_dict`) and hands it
+    over. Snapshots for the same slot that arrive while the writer is busy,
+    or within `coalesce_delay` seconds of each other, replace one another so
+    a burst of safe points (fight won, quest done, level-up) costs one write.
+    Each write is also recorded in `history` (a SaveHistory), if given.
+    """
+
+    def __init__(self, save_dir='saves', coalesce_delay=0.25, history=None):
+        self.save_dir = save_dir
+        self.history = history
+        self.coalesce_delay = coalesce_delay
+        self.pending = {}
+        self.writing = False
+        self.urgent = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def slot_for(self, player):
+        return os.path.join(self.save_dir, f'{player.name}_autosave.sav')
+
+    def snapshot(self, player):
+        """Queue the player's current state for saving. Never blocks on I/O"""
+        data = player.to_dict()
+        slot = self.slot_for(player)
+
+        with self.condition:
+            if self.closed:
+                return
+            self.pending[slot] = data
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending and self.closed:
+                    return
+                # Give a burst of safe points a moment to land in the same slot
+                self.condition.wait_for(lambda: self.urgent or self.closed, self.coalesce_delay)
+                batch = self.pending
+                self.pending = {}
+                self.urgent = False
+                self.writing = True
+
+            for slot, data in batch.items():
+                try:
+                    self._write(slot, data)
+                    if self.history is not None:
+                        self.history.record_data(data, 'autosave')
+                except OSError as e:
+                    print(f"\n⚠️ Autosave failed: {e}")
+
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+    def _write(self, slot, data):
+        if not os.path.exists(self.save_dir):
+            os.makedirs(self.save_dir)
+
+        temp_slot = slot + '.tmp'
+        with open(temp_slot, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_slot, slot)
+
+    def flush(self, timeout=None):
+        """Block until every queued snapshot has been written"""
+        with self.condition:
+            if self.thread is None:
+                return
+            self.urgent = True
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: not self.pending and not self.writing, timeout)
+
+    def close(self, timeout=None):
+        """Flush outstanding snapshots and stop the writer thread"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
@@ -0,0 +1,170 @@
+"""Memory of N worker processes with private content versus a shared content pack.
+
+Each worker does one of the following:
+
+- baseline: loads nothing.
+- private: builds its own item registry, enemy table and quest graph.
+- shared: maps a compiled content pack for enemies and quests, but still
+  builds a private item registry from the pack's items. This is what
+  `use_content_pack` gives a real worker, because inventories and loot go
+  through the in-process ItemRegistry.
+- pack-only: maps the pack and nothing else. This is a lower bound, not
+  what a game worker gets.
+
+Every worker stays alive until all of them have reported their memory, so
+pages shared through the pack are split between them. The report sums RSS
+and PSS (proportional set size, where a page shared by k processes counts
+1/k towards each) over the workers.
+
+The game's own catalog is tiny and is imported privately by every worker in
+every mode, including baseline. So `bots.py --shared-content` saves next to
+nothing with the built-in content; the savings below only appear with a large
+content set.
+
+Content is the game's own catalog plus `--scale` synthetic items, enemies and
+branching quests to stand in for a larger content set.
+
+Usage: python bench_content.py [--workers 1 8 32] [--scale 10000]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+
+from combat import ENEMY_TYPES
+from content_pack import ContentPack, compile_pack
+from character import Character
+from items import CATALOG, ItemRegistry
+from quest_graph import QuestGraph
+from quests import QUEST_CATALOG, quest_from_spec
+
+MODES = ('baseline', 'private', 'shared', 'pack-only')
+
+
+def synthetic_content(scale, seed=0):
+    """(items, enemies, quests) with scale extra entries of each"""
+    rng = random.Random(seed)
+    loot_names = [item['name'] for item in CATALOG]
+
+    items = list(CATALOG) + [
+        {'name': f'Relic {i}', 'type': 'accessory', 'description': f'An ancient relic from vault {i}'}
+        for i in range(scale)
+    ]
+
+    enemies = dict(ENEMY_TYPES)
+    for i in range(scale):
+        enemies[f'beast_{i}'] = {
+            'name': f'Wild Beast {i}',
+            'health': rng.randint(20, 400),
+            'attack': rng.randint(5, 40),
+            'defense': rng.randint(1, 20),
+            'exp': rng.randint(10, 500),
+            'gold': rng.randint(5, 200),
+            'loot': rng.sample(loot_names, 2),
+        }
+
+    quests = list(QUEST_CATALOG)
+    for i in range(scale):
+        requires = {'level': rng.randint(1, 20)}
+        if i:
+            requires['quests'] = [f'Side Quest {j}' for j in {rng.randrange(max(0, i - 100), i) for _ in range(2)}]
+        if i % 10 == 0:
+            requires['flags'] = [f'chapter_{i % 7}']
+        quests.append({
+            'name': f'Side Quest {i}',
+            'description': f'Help the villager with errand number {i}',
+            'quest_type': 'kill_any',
+            'target_amount': rng.randint(1, 10),
+            'reward_exp': rng.randint(10, 300),
+            'reward_gold': rng.randint(5, 150),
+            'reward_items': [rng.choice(loot_names)],
+            'requires': requires,
+        })
+    return items, enemies, quests
+
+
+def memory_usage():
+    """(rss_kb, pss_kb) of this process; PSS needs Linux, elsewhere it is RSS"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line and not line.startswith(' '))
+        return int(fields['Rss'].split()[0]), int(fields['Pss'].split()[0])
+    except (OSError, KeyError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss, rss
+
+
+def load_content(mode, scale, pack_path):
+    """Whatever a worker keeps alive for the given mode"""
+    if mode == 'private':
+        items, enemies, quests = synthetic_content(scale)
+        graph = QuestGraph([quest_from_spec(spec) for spec in quests])
+        return ItemRegistry(items), enemies, graph, graph.unlocks_for(Character('Worker', 'warrior'))
+
+    if mode in ('shared', 'pack-only'):
+        pack = ContentPack(pack_path)
+        # Touch every record so the whole pack is mapped in
+        for table in (pack.items, pack.enemies, pack.quests):
+            for index in range(len(table)):
+                table.fields_of(index)
+        unlocks = pack.quest_graph.unlocks_for(Character('Worker', 'warrior'))
+        if mode == 'pack-only':
+            return pack, unlocks
+        registry = ItemRegistry(dict(pack.items.fields_of(index)) for index in range(len(pack.items)))
+        return pack, unlocks, registry
+
+    return None
+
+
+def worker(mode, scale, pack_path, loaded, measured, results):
+    content = load_content(mode, scale, pack_path)
+    loaded.wait()
+    results.put(memory_usage())
+    measured.wait()
+    del content
+
+
+def measure(mode, workers, scale, pack_path):
+    """Summed (rss_kb, pss_kb) over workers that are all alive at once"""
+    context = multiprocessing.get_context('spawn')
+    loaded = context.Barrier(workers)
+    measured = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, scale, pack_path, loaded, measured, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    usage = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return sum(rss for rss, _ in usage), sum(pss for _, pss in usage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare worker memory with private and shared content")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--scale', type=int, default=10000, help="Synthetic items, enemies and quests to add")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='rpg_content_') as directory:
+        pack_path = compile_pack(os.path.join(directory, 'content.pack'), *synthetic_content(args.scale))
+        print(f"Content pack: {os.path.getsize(pack_path) / 1024:.0f} KB "
+              f"({len(CATALOG) + args.scale} items, {len(ENEMY_TYPES) + args.scale} enemies, "
+              f"{len(QUEST_CATALOG) + args.scale} quests)")
+
+        print(f"\n{'Workers':>7}  {'Mode':<10}{'RSS (MB)':>10}{'PSS (MB)':>10}{'Content PSS (MB)':>18}")
+        for workers in args.workers:
+            totals = {mode: measure(mode, workers, args.scale, pack_path) for mode in MODES}
+            baseline_pss = totals['baseline'][1]
+            for mode in MODES:
+                rss, pss = totals[mode]
+                print(f"{workers:>7}  {mode:<10}{rss / 1024:>10.1f}{pss / 1024:>10.1f}"
+                      f"{(pss - baseline_pss) / 1024:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark fork() against copy.deepcopy for what-if copies of game state.
+
+Builds a late-game character (high level, full inventory, active and
+completed quests) plus an enemy and the quest manager, then times cloning
+each of them both ways and checks that forks really are independent.
+
+Usage: python bench_fork.py [--level 15] [--items 40] [--repeat 2000]
+"""
+import argparse
+import contextlib
+import copy
+import io
+import timeit
+
+from character import Character
+from combat import CombatSystem
+from items import CATALOG, get_item
+from quests import QuestManager
+
+
+def late_game_state(level, items):
+    """(player, enemy, quest_manager) for a well-progressed character"""
+    quest_manager = QuestManager()
+    player = Character('Bench', 'warrior')
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(level - 1):
+            player.level_up()
+        for i in range(items):
+            player.add_item(get_item(CATALOG[i % len(CATALOG)]['name']))
+        player.equip_weapon(get_item('Flame Sword'))
+        player.equip_armor(get_item('Dragon Scale Armor'))
+
+        catalog = quest_manager.graph.quests
+        for quest in catalog[:len(catalog) // 2]:
+            done = quest.fork()
+            done.completed = True
+            player.completed_quests.append(done)
+        for index in range(len(quest_manager.get_available_quests(player))):
+            quest_manager.assign_quest(player, index)
+    player.achievements = ['First Victory', 'Seasoned', 'Wealthy']
+    player.story_flags = ['village_mystery']
+
+    enemy = CombatSystem.create_enemy('dragon', level)
+    return player, enemy, quest_manager
+
+
+def microseconds(function, repeat):
+    return min(timeit.repeat(function, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def check_independent(player, enemy, quest_manager):
+    """Writes to a fork must never show up in the original"""
+    fork = player.fork()
+    fork.inventory.pop()
+    fork.gold += 1
+    fork.quests[0].current_progress += 1
+    assert len(fork.inventory) == len(player.inventory) - 1
+    assert fork.gold == player.gold + 1
+    assert fork.quests[0].current_progress == player.quests[0].current_progress + 1
+    assert fork.inventory[0] is player.inventory[0]
+
+    enemy_fork = enemy.fork()
+    enemy_fork.take_damage(50)
+    assert enemy_fork.current_health < enemy.current_health
+
+    manager_fork = quest_manager.fork(player, fork)
+    before = [quest.name for quest in quest_manager.get_available_quests(player)]
+    manager_fork.unlocks_for(fork).quest_completed(before[0])
+    assert [quest.name for quest in quest_manager.get_available_quests(player)] == before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fork() against copy.deepcopy")
+    parser.add_argument('--level', type=int, default=15)
+    parser.add_argument('--items', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    player, enemy, quest_manager = late_game_state(args.level, args.items)
+    quest_manager.unlocks_for(player)
+    check_independent(player, enemy, quest_manager)
+
+    rows = [
+        ('Character', lambda: player.fork(), lambda: copy.deepcopy(player)),
+        ('Enemy', lambda: enemy.fork(), lambda: copy.deepcopy(enemy)),
+        ('QuestManager', lambda: quest_manager.fork(player, player), lambda: copy.deepcopy(quest_manager)),
+    ]
+
+    print(f"Level {player.level} character: {len(player.inventory)} items, {len(player.quests)} active "
+          f"and {len(player.completed_quests)} completed quests")
+    print(f"{'State':<14}{'fork (us)':>12}{'deepcopy (us)':>16}{'speedup':>10}")
+    for name, fork, deep in rows:
+        fork_time = microseconds(fork, args.repeat)
+        deep_time = microseconds(deep, max(1, args.repeat // 20))
+        print(f"{name:<14}{fork_time:>12.2f}{deep_time:>16.1f}{deep_time / fork_time:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Load test for the shared market: many sessions trading at once.
+
+Each session is a thread that keeps submitting random buy and sell orders
+for catalog items while the market's single writer ticks in the background.
+Sessions wait for their own last order every `--batch` orders so the queue
+cannot grow without bound. The report counts orders settled per second
+(filled or turned away for lack of stock or room) and the cost of a tick.
+
+Usage: python bench_market.py [--sessions 1 8 32] [--seconds 3] [--tick-ms 5]
+"""
+import argparse
+import random
+import threading
+import time
+
+from economy import Market
+from items import ITEMS
+
+
+def session(market, items, batch, deadline, seed, counts):
+    rng = random.Random(seed)
+    submitted = 0
+    while time.perf_counter() < deadline:
+        for _ in range(batch):
+            item = rng.choice(items)
+            if rng.random() < 0.5:
+                order = market.submit(item, 1, 10 ** 9)
+            else:
+                order = market.submit(item, -1, 0)
+        submitted += batch
+        market.settle(order)
+    counts.append(submitted)
+
+
+def run(sessions, seconds, tick_interval, batch):
+    market = Market()
+    items = [item for item in ITEMS.prototypes[:len(market.base)] if market.tradeable(item)]
+    counts = []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=session, args=(market, items, batch, deadline, seed, counts))
+        for seed in range(sessions)
+    ]
+
+    market.start(tick_interval)
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    market.stop()
+    elapsed = time.perf_counter() - started
+
+    settled = market.filled + market.rejected
+    assert settled + market.cancelled == sum(counts), "every submitted order must settle exactly once"
+    return {
+        'settled': settled,
+        'filled': market.filled,
+        'per_second': settled / elapsed,
+        'ticks': market.ticks,
+        'per_tick': settled / market.ticks,
+        'tick_us': market.tick_seconds / market.ticks * 1e6,
+        'market': market,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the shared market")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--tick-ms', type=float, default=5.0, help="Writer sleep between ticks")
+    parser.add_argument('--batch', type=int, default=200, help="Orders a session sends before waiting")
+    args = parser.parse_args()
+
+    print(f"{'Sessions':>8}{'Trades/s':>12}{'Filled':>9}{'Ticks':>8}{'Orders/tick':>13}{'Tick (us)':>11}")
+    for sessions in args.sessions:
+        result = run(sessions, args.seconds, args.tick_ms / 1000, args.batch)
+        print(f"{sessions:>8}{result['per_second']:>12,.0f}{result['filled'] / result['settled']:>9.0%}"
+              f"{result['ticks']:>8}{result['per_tick']:>13.0f}{result['tick_us']:>11.0f}")
+
+    market = result['market']
+    print("\nPrices after the last run (value -> price, stock):")
+    for name, base, price, units in zip(market.names, market.base, market.prices, market.stock):
+        if base:
+            print(f"  {name:<22}{base:>6.0f} -> {price:>7.1f}  {units:>5.1f}")
+
+
+if __name__ == '__main__':
+    main()
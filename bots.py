@@ -0,0 +1,327 @@
+"""Headless bot players for progression and throughput runs.
+
+Each bot drives a real RPGGame (exploring, taking quests, equipping upgrades,
+selling outgrown gear, buying and drinking potions and saving) with a pluggable
+strategy. A session ends when the bot dies or reaches the explore cap, and the
+report says how many explores were actually played. Sessions run across a
+process pool and the fleet reports progression curves.
+
+Usage: python bots.py [--sessions 1000] [--strategy greedy] [--explores 300]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from combat import CombatSystem
+from combat_ai import CombatAI
+from content_pack import compile_pack, use_content_pack
+from events import EVENTS, BinarySink, QuestCompleted
+from game import RPGGame
+from items import get_item
+from character import Character
+
+GOLD_SAMPLE_EVERY = 10
+
+
+class Strategy:
+    """Decides what a bot does between fights and during them"""
+    name = 'base'
+    heal_below = 0.5
+    save_every = 25
+    # Healing potions to keep in the pack, bought at the shop between fights
+    potion_stock = 3
+
+    def take_turn(self, bot):
+        self.accept_quests(bot)
+        self.equip_upgrades(bot)
+        self.trade(bot)
+        self.rest(bot)
+        bot.game.explore_world()
+        if bot.explores % self.save_every == 0:
+            bot.game.save_game()
+
+    def combat_action(self, player, enemy):
+        raise NotImplementedError
+
+    def accept_quests(self, bot):
+        game = bot.game
+        available = game.quest_manager.get_available_quests(game.player)
+        active = {quest.name for quest in game.player.quests}
+        for index, quest in enumerate(available):
+            if quest.name not in active:
+                game.quest_manager.assign_quest(game.player, index)
+
+    def equip_upgrades(self, bot):
+        player = bot.game.player
+        for item in list(player.inventory):
+            if item.get('type') == 'weapon':
+                current = player.equipped_weapon['damage'] if player.equipped_weapon else 0
+                if item['damage'] > current:
+                    bot.game.equip(item)
+            elif item.get('type') == 'armor':
+                current = player.equipped_armor['defense'] if player.equipped_armor else 0
+                if item['defense'] > current:
+                    bot.game.equip(item)
+
+    def trade(self, bot):
+        """Sell gear that lost out to an upgrade, restock healing potions"""
+        game = bot.game
+        player = game.player
+        for item in list(player.inventory):
+            if item.get('type') in ('weapon', 'armor') and game.market.tradeable(item):
+                game.shop.sell(player, item)
+        while len(healing_potions(player)) < self.potion_stock and self.buy_potion(bot):
+            pass
+
+    def buy_potion(self, bot):
+        """Buy the strongest healing potion the bot can afford"""
+        game = bot.game
+        player = game.player
+        affordable = [
+            potion for potion in (get_item(name) for name in POTIONS)
+            if game.market.in_stock(potion) and game.market.buy_price(potion) <= player.gold
+        ]
+        if not affordable:
+            return False
+        return game.shop.buy(player, max(affordable, key=lambda potion: potion['heal']))
+
+    def rest(self, bot):
+        """Heal back up between fights, buying a potion if the pack is empty"""
+        player = bot.game.player
+        while player.current_health < player.max_health * self.heal_below:
+            potion = best_potion(player)
+            if potion is None:
+                if not self.buy_potion(bot):
+                    break
+                continue
+            bot.game.consume(potion)
+
+
+POTIONS = ('Health Potion', 'Greater Health Potion', 'Master Health Potion')
+
+
+def healing_potions(player):
+    return [item for item in player.inventory if item.get('type') == 'consumable' and 'heal' in item]
+
+
+def best_potion(player):
+    potions = healing_potions(player)
+    return max(potions, key=lambda item: item['heal']) if potions else None
+
+
+class GreedyStrategy(Strategy):
+    """Hit with whatever does more damage, drink a potion when low"""
+    name = 'greedy'
+
+    def combat_action(self, player, enemy):
+        if player.current_health < player.max_health * 0.3:
+            potion = best_potion(player)
+            if potion is not None:
+                return "item", potion
+        attack = player.get_attack_power()
+        magic = player.magic + 2.5 if player.magic >= 5 else 0
+        return ("magic" if magic > attack else "attack"), None
+
+
+class CautiousStrategy(GreedyStrategy):
+    """Greedy, but runs from fights once out of potions and badly hurt"""
+    name = 'cautious'
+
+    def combat_action(self, player, enemy):
+        action, item = GreedyStrategy.combat_action(self, player, enemy)
+        if action != "item" and player.current_health < player.max_health * 0.25:
+            return "flee", None
+        return action, item
+
+
+class AutoBattleStrategy(Strategy):
+    """Fights with the expectimax combat AI"""
+    name = 'auto'
+
+    def __init__(self, time_budget=0.0005):
+        self.ai = CombatAI(time_budget=time_budget)
+
+    def combat_action(self, player, enemy):
+        return self.ai.choose_action(player, enemy)
+
+
+STRATEGIES = {
+    'greedy': GreedyStrategy,
+    'cautious': CautiousStrategy,
+    'auto': AutoBattleStrategy,
+}
+
+
+class Bot:
+    def __init__(self, strategy, character_class, save_dir, max_explores=300, name=None):
+        self.strategy = strategy
+        self.max_explores = max_explores
+        self.game = RPGGame(save_dir=save_dir, interactive=False)
+        self.game.attach_player(Character(name or f'Bot_{character_class}', character_class))
+        self.game.history.start_session(self.game.player)
+        self.game.combat_policy = self.combat_action
+        self.game.bus.subscribe(QuestCompleted, self.quest_completed)
+
+        self.explores = 0
+        self.fights = 0
+        self.last_enemy = None
+        self.started = time.perf_counter()
+        self.levels = {}
+        self.quests = {}
+        self.gold = []
+
+    def combat_action(self, player, enemy):
+        if enemy is not self.last_enemy:
+            self.last_enemy = enemy
+            self.fights += 1
+        return self.strategy.combat_action(player, enemy)
+
+    def quest_completed(self, event):
+        self.quests[event.quest.name] = [self.explores, time.perf_counter() - self.started]
+
+    def run(self):
+        player = self.game.player
+        while self.explores < self.max_explores and player.is_alive():
+            self.explores += 1
+            level = player.level
+            self.strategy.take_turn(self)
+            if player.level > level:
+                for reached in range(level + 1, player.level + 1):
+                    self.levels[reached] = [self.explores, self.fights, time.perf_counter() - self.started]
+            if self.explores % GOLD_SAMPLE_EVERY == 0:
+                self.gold.append(player.gold)
+
+        self.game.autosaver.close()
+        self.game.history.close(player)
+        return {
+            'class': player.character_class,
+            'died': not player.is_alive(),
+            'final_level': player.level,
+            'explores': self.explores,
+            'fights': self.fights,
+            'levels': self.levels,
+            'quests': self.quests,
+            'gold': self.gold,
+        }
+
+
+_worker_dir = None
+
+
+def _init_worker(fleet_dir, events_dir, content_path):
+    global _worker_dir
+    sys.stdout = open(os.devnull, 'w')
+    CombatSystem.round_delay = 0
+    _worker_dir = tempfile.mkdtemp(dir=fleet_dir)
+    if events_dir:
+        EVENTS.add_sink(BinarySink(os.path.join(events_dir, f'events_{os.getpid()}.bin')))
+    if content_path:
+        use_content_pack(content_path)
+
+
+def run_session(job):
+    """Play one bot session; runs inside a pool worker"""
+    strategy_name, character_class, max_explores, seed = job
+    random.seed(seed)
+    # Unique names keep each bot's save files apart
+    bot = Bot(STRATEGIES[strategy_name](), character_class, _worker_dir, max_explores, f'Bot_{seed}')
+    result = bot.run()
+    # Pool workers exit without running cleanup, so never leave events buffered
+    EVENTS.flush()
+    return result
+
+
+class BotFleet:
+    def __init__(self, strategy='greedy', classes=('warrior', 'mage', 'rogue'), max_explores=300, workers=None, seed=0,
+                 events_dir=None, shared_content=False):
+        self.strategy = strategy
+        self.events_dir = events_dir
+        # Compile content into one pack that every worker maps instead of building its own
+        self.shared_content = shared_content
+        self.classes = classes
+        self.max_explores = max_explores
+        self.workers = workers or os.cpu_count()
+        self.seed = seed
+
+    def run(self, sessions):
+        jobs = [
+            (self.strategy, self.classes[i % len(self.classes)], self.max_explores, self.seed + i)
+            for i in range(sessions)
+        ]
+        chunksize = max(1, sessions // (self.workers * 8))
+        # Bot saves and run history go to scratch space that is removed afterwards
+        with tempfile.TemporaryDirectory(prefix='rpg_bots_') as fleet_dir:
+            content_path = compile_pack(os.path.join(fleet_dir, 'content.pack')) if self.shared_content else None
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(fleet_dir, self.events_dir, content_path)) as pool:
+                return list(pool.map(run_session, jobs, chunksize=chunksize))
+
+
+def mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def report(results, elapsed):
+    """Print progression curves aggregated over all sessions"""
+    sessions = len(results)
+    explores = sum(r['explores'] for r in results)
+    finished = sum(not r['died'] for r in results)
+    print(f"\n🤖 {sessions} bot sessions in {elapsed:.1f}s ({sessions / elapsed * 60:.0f} sessions/minute, "
+          f"{explores / elapsed * 60:.0f} explores/minute)")
+    # Sessions end at the explore cap or at death, whichever comes first
+    print(f"   {explores / sessions:.1f} explores per session on average; "
+          f"{finished / sessions:.0%} survived to the explore cap")
+
+    for character_class in sorted({r['class'] for r in results}):
+        group = [r for r in results if r['class'] == character_class]
+        deaths = sum(r['died'] for r in group)
+        print(f"\n{character_class.title()}: {len(group)} sessions, death rate {deaths / len(group):.0%}, "
+              f"average final level {mean([r['final_level'] for r in group]):.1f}, "
+              f"average explores {mean([r['explores'] for r in group]):.1f}")
+
+        print("  Level  Reached  Explores  Fights")
+        for level in sorted({level for r in group for level in r['levels']}):
+            reached = [r['levels'][level] for r in group if level in r['levels']]
+            print(f"  {level:>5}  {len(reached) / len(group):>7.0%}  {mean([e for e, _, _ in reached]):>8.1f}  "
+                  f"{mean([f for _, f, _ in reached]):>6.1f}")
+
+        print("  Quest                      Done  Explores  Seconds")
+        for name in sorted({name for r in group for name in r['quests']}):
+            done = [r['quests'][name] for r in group if name in r['quests']]
+            print(f"  {name:<25} {len(done) / len(group):>5.0%}  {mean([e for e, _ in done]):>8.1f}  "
+                  f"{mean([s for _, s in done]):>7.3f}")
+
+        samples = max(len(r['gold']) for r in group)
+        curve = [mean([r['gold'][i] for r in group if len(r['gold']) > i]) for i in range(samples)]
+        step = max(1, samples // 10)
+        print("  Gold over time: " + ", ".join(
+            f"{(i + 1) * GOLD_SAMPLE_EVERY}: {curve[i]:.0f}" for i in range(0, samples, step)
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fleet of headless bot players")
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='greedy')
+    parser.add_argument('--explores', type=int, default=300, help="Explores per session before stopping")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--events', default=None, help="Directory for binary game-event logs, one per worker")
+    parser.add_argument('--shared-content', action='store_true', help="Map one compiled content pack in every worker")
+    args = parser.parse_args()
+
+    if args.events and not os.path.exists(args.events):
+        os.makedirs(args.events)
+    fleet = BotFleet(args.strategy, max_explores=args.explores, workers=args.workers, seed=args.seed,
+                     events_dir=args.events, shared_content=args.shared_content)
+    start = time.perf_counter()
+    results = fleet.run(args.sessions)
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
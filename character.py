@@ -1,5 +1,10 @@
 import json
 import random
+import uuid
+
+from events import DETACHED_BUS, ItemAdded, LevelUp, WeaponEquipped
+from items import ITEMS
+from quests import quest_from_dict
 
 class Character:
     def __init__(self, name, character_class):
@@ -42,6 +47,12 @@ class Character:
         self.equipped_armor = None
         self.quests = []
         self.completed_quests = []
+        self.achievements = []
+        self.story_flags = []
+        # Tells apart characters that share a name; run history keys sessions on it
+        self.character_id = uuid.uuid4().hex
+        # Set by the game this character plays in
+        self.bus = DETACHED_BUS
         
     def take_damage(self, damage):
         actual_damage = max(1, damage - self.defense)
@@ -74,24 +85,31 @@ class Character:
         self.defense += 1
         self.agility += 1
         
+        self.bus.defer(LevelUp(self, self.level))
+        
         print(f"\n🎉 {self.name} leveled up to level {self.level}!")
         print(f"Health increased to {self.max_health}")
         print(f"All stats improved!")
         
     def add_item(self, item):
+        item = ITEMS.intern(item)
         self.inventory.append(item)
+        self.bus.defer(ItemAdded(self, item))
         
     def remove_item(self, item_name):
-        for item in self.inventory:
-            if item['name'].lower() == item_name.lower():
-                self.inventory.remove(item)
-                return item
+        prototype = ITEMS.find(item_name)
+        if prototype is None:
+            return None
+        for i, item in enumerate(self.inventory):
+            if item.id == prototype.id:
+                return self.inventory.pop(i)
         return None
         
     def equip_weapon(self, weapon):
         if self.equipped_weapon:
             self.inventory.append(self.equipped_weapon)
         self.equipped_weapon = weapon
+        self.bus.defer(WeaponEquipped(self, weapon))
         
     def equip_armor(self, armor):
         if self.equipped_armor:
@@ -135,8 +153,26 @@ class Character:
         for i, item in enumerate(self.inventory, 1):
             print(f"{i}. {item['name']} - {item['description']}")
             
-    def save_to_file(self, filename):
-        data = {
+    def fork(self):
+        """Independent copy for what-if play (AI search, previews, bots).
+        
+        Item prototypes and quest definitions are immutable and shared; the
+        lists holding them and each active quest's progress are copied. The
+        fork is detached from any game, so nothing it does is published.
+        """
+        clone = object.__new__(Character)
+        clone.__dict__.update(self.__dict__)
+        clone.inventory = list(self.inventory)
+        clone.quests = [quest.fork() for quest in self.quests]
+        clone.completed_quests = list(self.completed_quests)
+        clone.achievements = list(self.achievements)
+        clone.story_flags = list(self.story_flags)
+        clone.bus = DETACHED_BUS
+        return clone
+        
+    def to_dict(self):
+        """Snapshot of the character's state as plain data"""
+        return {
             'name': self.name,
             'character_class': self.character_class,
             'level': self.level,
@@ -149,21 +185,22 @@ class Character:
             'defense': self.defense,
             'agility': self.agility,
             'gold': self.gold,
-            'inventory': self.inventory,
-            'equipped_weapon': self.equipped_weapon,
-            'equipped_armor': self.equipped_armor,
-            'quests': self.quests,
-            'completed_quests': self.completed_quests
+            'inventory': [ITEMS.to_ref(item) for item in self.inventory],
+            'equipped_weapon': ITEMS.to_ref(self.equipped_weapon),
+            'equipped_armor': ITEMS.to_ref(self.equipped_armor),
+            'quests': [quest.to_dict() for quest in self.quests],
+            'completed_quests': [quest.to_dict() for quest in self.completed_quests],
+            'achievements': list(self.achievements),
+            'story_flags': list(self.story_flags),
+            'character_id': self.character_id
         }
         
+    def save_to_file(self, filename):
         with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+            json.dump(self.to_dict(), f, indent=2)
             
     @classmethod
-    def load_from_file(cls, filename):
-        with open(filename, 'r') as f:
-            data = json.load(f)
-            
+    def from_dict(cls, data):
         character = cls(data['name'], data['character_class'])
         character.level = data['level']
         character.experience = data['experience']
@@ -175,10 +212,21 @@ class Character:
         character.defense = data['defense']
         character.agility = data['agility']
         character.gold = data['gold']
-        character.inventory = data['inventory']
-        character.equipped_weapon = data['equipped_weapon']
-        character.equipped_armor = data['equipped_armor']
-        character.quests = data['quests']
-        character.completed_quests = data['completed_quests']
+        character.inventory = [ITEMS.from_ref(ref) for ref in data['inventory']]
+        character.equipped_weapon = ITEMS.from_ref(data['equipped_weapon'])
+        character.equipped_armor = ITEMS.from_ref(data['equipped_armor'])
+        character.quests = [quest_from_dict(quest) for quest in data['quests']]
+        character.completed_quests = [quest_from_dict(quest) for quest in data['completed_quests']]
+        character.achievements = data.get('achievements', [])
+        character.story_flags = data.get('story_flags', [])
+        # Older saves get a fresh ID, kept from their next save on
+        character.character_id = data.get('character_id', character.character_id)
         
         return character
+            
+    @classmethod
+    def load_from_file(cls, filename):
+        with open(filename, 'r') as f:
+            data = json.load(f)
+            
+        return cls.from_dict(data)
@@ -1,9 +1,17 @@
+import json
+import os
 import random
 import time
 
+from combat_ai import CombatAI
+from commands import COMMANDS
+from events import DamageDealt, EnemyKilled, FightEnded, GoldGained, LootDropped
+from items import get_item
+
 class Enemy:
-    def __init__(self, name, health, attack, defense, exp_reward, gold_reward, loot=None):
+    def __init__(self, name, health, attack, defense, exp_reward, gold_reward, loot=None, enemy_type=None):
         self.name = name
+        self.enemy_type = enemy_type
         self.max_health = health
         self.current_health = health
         self.attack = attack
@@ -20,85 +28,124 @@ class Enemy:
     def is_alive(self):
         return self.current_health > 0
         
+    def fork(self):
+        """Copy with its own health; the loot table is shared"""
+        clone = object.__new__(Enemy)
+        clone.__dict__.update(self.__dict__)
+        return clone
+        
     def attack_player(self, player):
         damage = random.randint(self.attack - 2, self.attack + 2)
         actual_damage = player.take_damage(damage)
+        if player.bus.wants(DamageDealt):
+            player.bus.publish(DamageDealt(self, player, actual_damage, 'enemy'))
         return actual_damage
 
+# Base stats at level 1; loot is listed by item name
+ENEMY_TYPES = {
+    'goblin': {
+        'name': 'Goblin',
+        'health': 30,
+        'attack': 8,
+        'defense': 2,
+        'exp': 25,
+        'gold': 15,
+        'loot': ['Rusty Dagger', 'Health Potion']
+    },
+    'orc': {
+        'name': 'Orc Warrior',
+        'health': 60,
+        'attack': 12,
+        'defense': 4,
+        'exp': 50,
+        'gold': 30,
+        'loot': ['Iron Sword', 'Leather Armor']
+    },
+    'troll': {
+        'name': 'Cave Troll',
+        'health': 100,
+        'attack': 15,
+        'defense': 8,
+        'exp': 100,
+        'gold': 60,
+        'loot': ['Troll Club', 'Greater Health Potion']
+    },
+    'dragon': {
+        'name': 'Young Dragon',
+        'health': 200,
+        'attack': 25,
+        'defense': 15,
+        'exp': 300,
+        'gold': 150,
+        'loot': ['Dragon Scale Armor', 'Flame Sword']
+    }
+}
+
+# Tuned enemy scaling written by tuner.py; see CombatSystem.level_multiplier
+SCALING_FILE = 'scaling.json'
+DEFAULT_SCALING = (1.0, 0.3)
+
 class CombatSystem:
+    # Policy behind the "Auto" combat action
+    auto_battler = CombatAI(time_budget=0.001)
+    
+    # Seconds to pause after each round; headless runs set this to 0
+    round_delay = 1
+    
+    # Enemy definitions by type; content_pack.use_content_pack swaps in a packed table
+    enemy_types = ENEMY_TYPES
+    
+    # {enemy_type: {stat: [base, growth]}}, loaded from SCALING_FILE on first use
+    scaling_table = None
+    
+    @staticmethod
+    def load_scaling_table(filename=SCALING_FILE):
+        """Load a tuned scaling table, falling back to the default curve"""
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                CombatSystem.scaling_table = json.load(f)
+        else:
+            CombatSystem.scaling_table = {}
+        return CombatSystem.scaling_table
+    
+    @staticmethod
+    def level_multiplier(enemy_type, stat, player_level):
+        if CombatSystem.scaling_table is None:
+            CombatSystem.load_scaling_table()
+        base, growth = CombatSystem.scaling_table.get(enemy_type, {}).get(stat, DEFAULT_SCALING)
+        return base + (player_level - 1) * growth
+    
     @staticmethod
     def create_enemy(enemy_type, player_level):
         """Create enemies scaled to player level"""
-        base_enemies = {
-            'goblin': {
-                'name': 'Goblin',
-                'health': 30,
-                'attack': 8,
-                'defense': 2,
-                'exp': 25,
-                'gold': 15,
-                'loot': [
-                    {'name': 'Rusty Dagger', 'type': 'weapon', 'damage': 3, 'description': 'A worn dagger'},
-                    {'name': 'Health Potion', 'type': 'consumable', 'heal': 30, 'description': 'Restores 30 HP'}
-                ]
-            },
-            'orc': {
-                'name': 'Orc Warrior',
-                'health': 60,
-                'attack': 12,
-                'defense': 4,
-                'exp': 50,
-                'gold': 30,
-                'loot': [
-                    {'name': 'Iron Sword', 'type': 'weapon', 'damage': 8, 'description': 'A sturdy iron blade'},
-                    {'name': 'Leather Armor', 'type': 'armor', 'defense': 5, 'description': 'Basic leather protection'}
-                ]
-            },
-            'troll': {
-                'name': 'Cave Troll',
-                'health': 100,
-                'attack': 15,
-                'defense': 8,
-                'exp': 100,
-                'gold': 60,
-                'loot': [
-                    {'name': 'Troll Club', 'type': 'weapon', 'damage': 12, 'description': 'A massive wooden club'},
-                    {'name': 'Greater Health Potion', 'type': 'consumable', 'heal': 60, 'description': 'Restores 60 HP'}
-                ]
-            },
-            'dragon': {
-                'name': 'Young Dragon',
-                'health': 200,
-                'attack': 25,
-                'defense': 15,
-                'exp': 300,
-                'gold': 150,
-                'loot': [
-                    {'name': 'Dragon Scale Armor', 'type': 'armor', 'defense': 15, 'description': 'Armor made from dragon scales'},
-                    {'name': 'Flame Sword', 'type': 'weapon', 'damage': 20, 'description': 'A sword imbued with dragon fire'}
-                ]
-            }
-        }
-        
-        enemy_data = base_enemies.get(enemy_type, base_enemies['goblin'])
+        if enemy_type not in CombatSystem.enemy_types:
+            enemy_type = 'goblin'
+        enemy_data = CombatSystem.enemy_types[enemy_type]
         
         # Scale enemy to player level
-        level_multiplier = 1 + (player_level - 1) * 0.3
+        def scaled(stat, value):
+            return int(value * CombatSystem.level_multiplier(enemy_type, stat, player_level))
         
         enemy = Enemy(
             name=enemy_data['name'],
-            health=int(enemy_data['health'] * level_multiplier),
-            attack=int(enemy_data['attack'] * level_multiplier),
-            defense=int(enemy_data['defense'] * level_multiplier),
-            exp_reward=int(enemy_data['exp'] * level_multiplier),
-            gold_reward=int(enemy_data['gold'] * level_multiplier),
-            loot=enemy_data['loot'].copy()
+            health=scaled('health', enemy_data['health']),
+            attack=scaled('attack', enemy_data['attack']),
+            defense=scaled('defense', enemy_data['defense']),
+            exp_reward=scaled('exp', enemy_data['exp']),
+            gold_reward=scaled('gold', enemy_data['gold']),
+            loot=[get_item(name) for name in enemy_data['loot']],
+            enemy_type=enemy_type
         )
         
         return enemy
     
     @staticmethod
-    def combat_encounter(player, enemy):
+    def combat_encounter(player, enemy, choose_action=None):
+        """Fight until someone falls or the player flees.
+        
+        choose_action(player, enemy) -> (action, item) replaces the combat
+        menu when given, e.g. for bots.
+        """
         print(f"\n⚔️ A wild {enemy.name} appears!")
         print(f"{enemy.name}: {enemy.current_health}/{enemy.max_health} HP")
         
@@ -106,18 +153,26 @@ class CombatSystem:
             print(f"\n💖 Your Health: {player.current_health}/{player.max_health}")
             print(f"👹 {enemy.name} Health: {enemy.current_health}/{enemy.max_health}")
             
-            action = CombatSystem.get_combat_action(player)
+            if choose_action:
+                action, item = choose_action(player, enemy)
+            else:
+                action, item = CombatSystem.get_combat_action(player), None
+            
+            if action == "auto":
+                action, item = CombatSystem.auto_battler.choose_action(player, enemy)
+                print(f"🤖 Auto: {item['name'] if item else action}")
             
             if action == "attack":
                 CombatSystem.player_attack(player, enemy)
             elif action == "magic":
                 CombatSystem.player_magic_attack(player, enemy)
             elif action == "item":
-                if not CombatSystem.use_item_in_combat(player):
+                if not CombatSystem.use_item_in_combat(player, item):
                     continue  # Don't waste turn if no item used
             elif action == "flee":
                 if CombatSystem.attempt_flee(player, enemy):
                     print("You successfully fled from battle!")
+                    player.bus.defer(FightEnded(player, enemy.enemy_type, 'fled', 0, 0))
                     return False
                 else:
                     print("You couldn't escape!")
@@ -129,9 +184,11 @@ class CombatSystem:
                 
                 if not player.is_alive():
                     print("💀 You have been defeated!")
+                    player.bus.defer(FightEnded(player, enemy.enemy_type, 'died', 0, 0))
                     return False
                     
-            time.sleep(1)  # Pause for dramatic effect
+            if CombatSystem.round_delay and not COMMANDS.pending:
+                time.sleep(CombatSystem.round_delay)  # Pause for dramatic effect
         
         # Player won
         if player.is_alive():
@@ -139,13 +196,17 @@ class CombatSystem:
             player.add_experience(enemy.exp_reward)
             player.gold += enemy.gold_reward
             print(f"💰 Gained {enemy.gold_reward} gold and {enemy.exp_reward} experience!")
+            player.bus.defer(EnemyKilled(player, enemy.enemy_type))
+            player.bus.defer(GoldGained(player, enemy.gold_reward, 'fight'))
             
             # Loot drop
             if enemy.loot and random.random() < 0.3:  # 30% chance for loot
                 loot_item = random.choice(enemy.loot)
                 player.add_item(loot_item)
+                player.bus.defer(LootDropped(player, enemy, loot_item))
                 print(f"🎁 You found: {loot_item['name']}!")
             
+            player.bus.defer(FightEnded(player, enemy.enemy_type, 'won', enemy.gold_reward, enemy.exp_reward))
             return True
         
         return False
@@ -158,8 +219,9 @@ class CombatSystem:
             print("2. Magic Attack")
             print("3. Use Item")
             print("4. Flee")
+            print("5. Auto")
             
-            choice = input("Choose your action (1-4): ").strip()
+            choice = COMMANDS.read("Choose your action (1-5): ").strip()
             
             if choice == "1":
                 return "attack"
@@ -169,14 +231,58 @@ class CombatSystem:
                 return "item"
             elif choice == "4":
                 return "flee"
+            elif choice == "5":
+                return "auto"
             else:
                 print("Invalid choice. Please try again.")
     
     @staticmethod
-    def player_attack(player, enemy):
+    def simulate_fight(player, enemy, choose_action, max_rounds=100):
+        """Play a fight silently with the same rules as combat_encounter.
+        
+        choose_action(player, enemy) returns (action, item). Returns
+        (outcome, rounds) where outcome is 'won', 'died', 'fled' or 'timeout'.
+        No rewards are handed out.
+        """
+        for rounds in range(1, max_rounds + 1):
+            action, item = choose_action(player, enemy)
+            
+            if action == "attack":
+                enemy.take_damage(CombatSystem.roll_attack(player))
+            elif action == "magic":
+                if player.magic >= 5:
+                    enemy.take_damage(CombatSystem.roll_magic(player))
+            elif action == "item":
+                if item is None:
+                    continue
+                player.heal(item['heal'])
+                player.inventory.remove(item)
+            elif action == "flee":
+                if CombatSystem.attempt_flee(player, enemy):
+                    return 'fled', rounds
+            
+            if not enemy.is_alive():
+                return 'won', rounds
+            enemy.attack_player(player)
+            if not player.is_alive():
+                return 'died', rounds
+        
+        return 'timeout', max_rounds
+    
+    @staticmethod
+    def roll_attack(player):
         attack_power = player.get_attack_power()
-        damage = random.randint(attack_power - 2, attack_power + 2)
-        actual_damage = enemy.take_damage(damage)
+        return random.randint(attack_power - 2, attack_power + 2)
+    
+    @staticmethod
+    def roll_magic(player):
+        return random.randint(player.magic, player.magic + 5)
+    
+    @staticmethod
+    def player_attack(player, enemy):
+        actual_damage = enemy.take_damage(CombatSystem.roll_attack(player))
+        if player.bus.wants(DamageDealt):
+            player.bus.publish(DamageDealt(player, enemy, actual_damage, 'attack'))
         print(f"⚡ You attack for {actual_damage} damage!")
         
         if not enemy.is_alive():
@@ -188,15 +294,22 @@ class CombatSystem:
             print("❌ You don't have enough magic power!")
             return
             
-        magic_damage = random.randint(player.magic, player.magic + 5)
-        actual_damage = enemy.take_damage(magic_damage)
+        actual_damage = enemy.take_damage(CombatSystem.roll_magic(player))
+        if player.bus.wants(DamageDealt):
+            player.bus.publish(DamageDealt(player, enemy, actual_damage, 'magic'))
         print(f"✨ Your magic attack deals {actual_damage} damage!")
         
         if not enemy.is_alive():
             print(f"💀 {enemy.name} has been defeated!")
     
     @staticmethod
-    def use_item_in_combat(player):
+    def use_item_in_combat(player, item=None):
+        if item is not None:
+            healed = player.heal(item['heal'])
+            print(f"💚 You used {item['name']} and recovered {healed} HP!")
+            player.inventory.remove(item)
+            return True
+        
         consumables = [item for item in player.inventory if item.get('type') == 'consumable']
         
         if not consumables:
@@ -208,7 +321,7 @@ class CombatSystem:
             print(f"{i}. {item['name']} - {item['description']}")
         
         try:
-            choice = int(input("Choose item to use (0 to cancel): "))
+            choice = int(COMMANDS.read("Choose item to use (0 to cancel): "))
             if choice == 0:
                 return False
             if 1 <= choice <= len(consumables):
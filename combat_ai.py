@@ -0,0 +1,166 @@
+import math
+import time
+from collections import Counter
+
+WIN = 1.0
+LOSS = 0.0
+
+
+class SearchTimeout(Exception):
+    """Raised when the deadline passes; `best` is the best root move so far"""
+    best = None
+
+
+class CombatAI:
+    """Expectimax search over the combat rules in combat.py.
+
+    Values are estimated win chances in [0, 1]: a kill is 1, a death is 0
+    and a successful escape is worth `flee_value`. Each player move is
+    followed by the enemy's attack, mirroring `combat_encounter`. Search runs
+    by iterative deepening until `time_budget` seconds are spent, and
+    positions already searched are looked up in a bounded transposition table.
+    """
+
+    def __init__(self, time_budget=0.001, max_depth=8, table_size=100000, flee_value=0.3):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.flee_value = flee_value
+        self.table = {}
+        self.rules = None
+        self.deadline = None
+
+    def choose_action(self, player, enemy):
+        """Return (action, item) where item is the consumable to use, if any"""
+        self.deadline = time.perf_counter() + self.time_budget
+        self._load_rules(player, enemy)
+        potions = self._potions(player)
+        state = (player.current_health, enemy.current_health, potions)
+
+        # Deeper passes only replace the answer once they finish; a first pass
+        # cut short still answers with the best root move it got to
+        best = None
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = self._best_move(state, depth)
+            except SearchTimeout as timeout:
+                if best is None:
+                    best = timeout.best or ("attack", None)
+                break
+
+        action, heal = best
+        item = None
+        if action == "item":
+            item = next(i for i in player.inventory if i.get('type') == 'consumable' and i.get('heal') == heal)
+        return action, item
+
+    def _load_rules(self, player, enemy):
+        attack_power = player.get_attack_power()
+        rules = (
+            attack_power, player.magic, player.defense, player.max_health,
+            enemy.attack, enemy.defense, player.agility
+        )
+        if rules == self.rules:
+            return
+
+        # A new matchup invalidates every stored value
+        self.rules = rules
+        self.table = {}
+        self.attack_outcomes = self._spread(attack_power - 2, attack_power + 2, enemy.defense)
+        if player.magic < 5:
+            self.magic_outcomes = [(0, 1.0)]
+        else:
+            self.magic_outcomes = self._spread(player.magic, player.magic + 5, enemy.defense)
+        self.enemy_outcomes = self._spread(enemy.attack - 2, enemy.attack + 2, player.defense)
+        self.flee_chance = player.agility / (player.agility + enemy.attack)
+        self.max_health = player.max_health
+        self.average_hit = max(
+            sum(d * p for d, p in self.attack_outcomes),
+            sum(d * p for d, p in self.magic_outcomes)
+        )
+        self.average_enemy_hit = sum(d * p for d, p in self.enemy_outcomes)
+
+    @staticmethod
+    def _spread(low, high, defense):
+        """Distinct damage values of randint(low, high) after take_damage"""
+        counts = Counter(max(1, roll - defense) for roll in range(low, high + 1))
+        total = high - low + 1
+        return [(damage, count / total) for damage, count in counts.items()]
+
+    @staticmethod
+    def _potions(player):
+        return tuple(sorted(
+            item['heal'] for item in player.inventory
+            if item.get('type') == 'consumable' and 'heal' in item
+        ))
+
+    def _best_move(self, state, depth):
+        best_move = None
+        best_value = -1.0
+        try:
+            for move, value in self._moves(state, depth):
+                if value > best_value:
+                    best_move, best_value = move, value
+        except SearchTimeout as timeout:
+            timeout.best = best_move
+            raise
+        return best_move
+
+    def _moves(self, state, depth):
+        player_health, enemy_health, potions = state
+        yield ("attack", None), self._strike(self.attack_outcomes, state, depth)
+        yield ("magic", None), self._strike(self.magic_outcomes, state, depth)
+
+        if player_health < self.max_health:
+            for heal in sorted(set(potions)):
+                remaining = list(potions)
+                remaining.remove(heal)
+                healed = min(self.max_health, player_health + heal)
+                value = self._enemy_turn(healed, enemy_health, tuple(remaining), depth)
+                yield ("item", heal), value
+
+        caught = self._enemy_turn(player_health, enemy_health, potions, depth)
+        yield ("flee", None), self.flee_chance * self.flee_value + (1 - self.flee_chance) * caught
+
+    def _strike(self, outcomes, state, depth):
+        player_health, enemy_health, potions = state
+        value = 0.0
+        for damage, chance in outcomes:
+            if damage >= enemy_health:
+                value += chance * WIN
+            else:
+                value += chance * self._enemy_turn(player_health, enemy_health - damage, potions, depth)
+        return value
+
+    def _enemy_turn(self, player_health, enemy_health, potions, depth):
+        # Every move at every depth, the root's included, passes through here
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        value = 0.0
+        for damage, chance in self.enemy_outcomes:
+            if damage < player_health:
+                value += chance * self._search((player_health - damage, enemy_health, potions), depth - 1)
+        return value
+
+    def _search(self, state, depth):
+        if depth <= 0:
+            return self._estimate(state)
+
+        entry = self.table.get(state)
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+
+        value = max(value for _, value in self._moves(state, depth))
+
+        if len(self.table) >= self.table_size:
+            # Evict the oldest entry; dicts keep insertion order
+            del self.table[next(iter(self.table))]
+        self.table[state] = (depth, value)
+        return value
+
+    def _estimate(self, state):
+        """Leaf heuristic comparing rounds-to-kill with rounds-to-die"""
+        player_health, enemy_health, potions = state
+        turns_to_kill = math.ceil(enemy_health / max(self.average_hit, 1))
+        turns_to_die = math.ceil((player_health + sum(potions)) / max(self.average_enemy_hit, 1))
+        return turns_to_die / (turns_to_die + turns_to_kill)
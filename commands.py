@@ -0,0 +1,153 @@
+"""Command queue and macros for grinding without a keystroke per prompt.
+
+Every prompt in the game reads through COMMANDS. Answers for several prompts
+can be chained with ';', so `2;5` at the main menu explores and picks Auto in
+the fight that follows. Queued answers skip the pacing delays and are dropped
+as soon as the game reports a reason to stop (low HP, a level-up, a quest
+completing) so the player gets control back.
+
+Macros repeat an action many times with a fixed combat policy and print one
+summary at the end:
+
+    explore x50 --auto-attack --stop-below 30%hp
+"""
+import re
+from collections import deque, namedtuple
+
+from events import AchievementUnlocked, FightEnded, GoldGained, LevelUp, LootDropped, QuestCompleted
+
+# Stop queued commands and macros below this fraction of max HP
+DEFAULT_STOP_BELOW = 0.25
+
+MACRO_ACTIONS = ('explore',)
+MACRO_POLICIES = {'--auto-attack': 'attack', '--auto': 'auto'}
+
+Macro = namedtuple('Macro', 'action count policy stop_below verbose')
+
+
+class CommandQueue:
+    def __init__(self):
+        self.pending = deque()
+        # Called before a queued answer is used; returns a reason to stop or None
+        self.guard = None
+
+    def push(self, line):
+        self.pending.extend(part.strip() for part in line.split(';'))
+
+    def cancel(self, reason):
+        if self.pending:
+            print(f"\n⛔ Stopping queued commands: {reason}")
+            self.pending.clear()
+
+    def read(self, prompt=''):
+        """Next queued answer, or a fresh line from the player"""
+        if self.pending and self.guard:
+            reason = self.guard()
+            if reason:
+                self.cancel(reason)
+
+        if not self.pending:
+            line = input(prompt)
+            if ';' not in line:
+                return line
+            self.push(line)
+
+        answer = self.pending.popleft()
+        print(f"{prompt}{answer}")
+        return answer
+
+
+def parse_stop_below(text):
+    """'30%hp', '30%' or '30' -> 0.3"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)%?(?:hp)?', text.lower())
+    if not match:
+        raise ValueError(f"Bad HP threshold: {text}")
+    return float(match.group(1)) / 100
+
+
+def parse_macro(line):
+    """Parse 'explore x50 --auto-attack --stop-below 30%hp'.
+
+    Returns None when the line is not a macro and raises ValueError when it
+    is one but malformed.
+    """
+    tokens = line.split()
+    if not tokens or tokens[0].lower() not in MACRO_ACTIONS:
+        return None
+
+    action = tokens[0].lower()
+    count = 1
+    policy = 'attack'
+    stop_below = DEFAULT_STOP_BELOW
+    verbose = False
+
+    rest = iter(tokens[1:])
+    for token in rest:
+        if re.fullmatch(r'x\d+', token):
+            count = int(token[1:])
+        elif token in MACRO_POLICIES:
+            policy = MACRO_POLICIES[token]
+        elif token == '--stop-below':
+            stop_below = parse_stop_below(next(rest, ''))
+        elif token == '--verbose':
+            verbose = True
+        else:
+            raise ValueError(f"Unknown macro option: {token}")
+
+    return Macro(action, count, policy, stop_below, verbose)
+
+
+class MacroSummary:
+    """Tallies what happened during a macro from the game's events"""
+
+    def __init__(self):
+        self.runs = 0
+        self.outcomes = {'won': 0, 'fled': 0, 'died': 0}
+        self.gold = 0
+        self.exp = 0
+        self.loot = []
+        self.levels = []
+        self.quests = []
+        self.achievements = []
+        self.stop_reason = None
+        self.handlers = {
+            FightEnded: self.on_fight,
+            GoldGained: lambda e: setattr(self, 'gold', self.gold + e.amount),
+            LootDropped: lambda e: self.loot.append(e.item['name']),
+            LevelUp: lambda e: self.levels.append(e.level),
+            QuestCompleted: lambda e: self.quests.append(e.quest.name),
+            AchievementUnlocked: lambda e: self.achievements.append(e.achievement),
+        }
+
+    def attach(self, bus):
+        for topic, handler in self.handlers.items():
+            bus.subscribe(topic, handler)
+
+    def detach(self, bus):
+        for topic, handler in self.handlers.items():
+            bus.unsubscribe(topic, handler)
+
+    def on_fight(self, event):
+        self.outcomes[event.outcome] += 1
+        self.exp += event.exp
+
+    def display(self, macro, player):
+        fights = sum(self.outcomes.values())
+        print(f"\n📋 Macro: {macro.action} x{self.runs} of {macro.count}")
+        print(f"  Fights: {fights} ({self.outcomes['won']} won, "
+              f"{self.outcomes['fled']} fled, {self.outcomes['died']} lost)")
+        print(f"  Gained: {self.gold} gold, {self.exp} experience")
+        if self.loot:
+            print(f"  Loot: {', '.join(self.loot)}")
+        if self.levels:
+            print(f"  Reached level {self.levels[-1]}")
+        if self.quests:
+            print(f"  Quests completed: {', '.join(self.quests)}")
+        if self.achievements:
+            print(f"  Achievements: {', '.join(self.achievements)}")
+        print(f"  Health: {player.current_health}/{player.max_health}")
+        if self.stop_reason:
+            print(f"  ⛔ Stopped early: {self.stop_reason}")
+
+
+COMMANDS = CommandQueue()
@@ -0,0 +1,395 @@
+"""Game content compiled into one read-only file shared by worker processes.
+
+By default every process builds its own item registry, enemy table and quest
+graph, so a pool of N workers holds N copies. A content pack is compiled once
+into a packed binary layout; workers mmap it read-only, so the operating
+system keeps a single copy in the page cache no matter how many attach:
+
+    compile_pack('content.pack')          # once, in the parent
+    use_content_pack('content.pack')      # in each worker
+
+Layout: the magic, a length-prefixed JSON header, then 8-byte aligned
+sections. Each table (items, enemies, quests) is an array of fixed-size
+records: a bitmask of present fields followed by an int64 or a string
+reference (offset, length into a shared UTF-8 heap) per field, plus an index
+of record numbers sorted by case-folded key for binary search. Quests are
+stored in topological order, together with QuestGraph's prerequisite counts
+and reverse indexes as flat int32 arrays, so QuestUnlocks runs on the
+mapped pages directly.
+
+Accessors decode fields on demand and never copy a table.
+"""
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+
+from combat import ENEMY_TYPES, CombatSystem
+from items import CATALOG
+from quest_graph import QuestGraph, QuestUnlocks
+from quests import QUEST_CATALOG, QuestManager, quest_from_spec
+
+MAGIC = b'RPGPACK1'
+HEADER_LENGTH = struct.Struct('<I')
+STRING_REF = struct.Struct('<II')
+
+# Fields per table. 'int' is stored inline; 'str' and 'json' live in the heap
+TABLE_FIELDS = {
+    'items': (
+        ('name', 'str'), ('type', 'str'), ('description', 'str'),
+        ('damage', 'int'), ('defense', 'int'), ('heal', 'int'), ('value', 'int'),
+    ),
+    'enemies': (
+        ('key', 'str'), ('name', 'str'), ('health', 'int'), ('attack', 'int'),
+        ('defense', 'int'), ('exp', 'int'), ('gold', 'int'), ('loot', 'json'),
+    ),
+    'quests': (
+        ('name', 'str'), ('description', 'str'), ('quest_type', 'str'), ('target', 'str'),
+        ('target_amount', 'int'), ('reward_exp', 'int'), ('reward_gold', 'int'),
+        ('reward_items', 'json'), ('requires', 'json'),
+    ),
+}
+TABLE_KEYS = {'items': 'name', 'enemies': 'key', 'quests': 'name'}
+
+
+def record_struct(fields):
+    return struct.Struct('<I' + ''.join('q' if kind == 'int' else 'II' for _, kind in fields))
+
+
+class PackWriter:
+    def __init__(self):
+        self.heap = bytearray()
+        self.strings = {}
+        self.sections = []
+
+    def string(self, text):
+        ref = self.strings.get(text)
+        if ref is None:
+            encoded = text.encode('utf-8')
+            ref = self.strings[text] = (len(self.heap), len(encoded))
+            self.heap += encoded
+        return ref
+
+    def section(self, name, data):
+        self.sections.append((name, bytes(data)))
+
+    def int_array(self, name, values):
+        self.section(name, array('i', values).tobytes())
+
+    def string_array(self, name, values):
+        refs = bytearray()
+        for value in values:
+            refs += STRING_REF.pack(*self.string(value))
+        self.section(name, refs)
+
+    def table(self, name, rows):
+        fields = TABLE_FIELDS[name]
+        layout = record_struct(fields)
+        records = bytearray()
+        known = {field for field, _ in fields}
+        for row in rows:
+            unknown = set(row) - known
+            if unknown:
+                raise ValueError(f"{name}: no packed layout for {', '.join(sorted(unknown))}")
+            mask = 0
+            values = []
+            for bit, (field, kind) in enumerate(fields):
+                value = row.get(field)
+                if value is not None:
+                    mask |= 1 << bit
+                if kind == 'int':
+                    values.append(value or 0)
+                else:
+                    text = json.dumps(value) if kind == 'json' else (value or '')
+                    values.extend(self.string(text))
+            records += layout.pack(mask, *values)
+        self.section(f'{name}.records', records)
+
+        key = TABLE_KEYS[name]
+        order = sorted(range(len(rows)), key=lambda i: rows[i][key].lower())
+        self.int_array(f'{name}.by_key', order)
+
+    def adjacency(self, name, successors, keys):
+        """CSR arrays: targets of keys[i] are targets[offsets[i]:offsets[i + 1]]"""
+        offsets = [0]
+        targets = []
+        for key in keys:
+            targets.extend(successors.get(key, ()))
+            offsets.append(len(targets))
+        self.int_array(f'{name}.offsets', offsets)
+        self.int_array(f'{name}.targets', targets)
+
+    def write(self, path):
+        self.section('heap', self.heap)
+
+        directory = {}
+        body = bytearray()
+        for name, data in self.sections:
+            body += b'\0' * (-len(body) % 8)
+            directory[name] = [len(body), len(data)]
+            body += data
+        header = json.dumps({'version': 1, 'sections': directory}).encode('utf-8')
+
+        prefix = MAGIC + HEADER_LENGTH.pack(len(header)) + header
+        prefix += b'\0' * (-len(prefix) % 8)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(prefix)
+            f.write(body)
+        os.replace(temp_path, path)
+
+
+def compile_pack(path, items=CATALOG, enemies=ENEMY_TYPES, quests=QUEST_CATALOG):
+    """Write items, enemies and quest specs into a content pack at path"""
+    graph = QuestGraph([quest_from_spec(spec) for spec in quests])
+    specs = {spec['name']: spec for spec in quests}
+    ordered = [specs[quest.name] for quest in graph.quests]
+
+    writer = PackWriter()
+    writer.table('items', items)
+    writer.table('enemies', [dict(fields, key=key) for key, fields in enemies.items()])
+    writer.table('quests', ordered)
+
+    writer.int_array('graph.requirements', graph.requirement_counts)
+    writer.adjacency('graph.after_quest', graph.after_quest, [quest.name for quest in graph.quests])
+    for kind, successors in (('items', graph.after_item), ('flags', graph.after_flag)):
+        keys = sorted(successors, key=str.lower)
+        writer.string_array(f'graph.{kind}.keys', keys)
+        writer.adjacency(f'graph.after_{kind}', successors, keys)
+    writer.int_array('graph.min_level_keys', graph.min_level_keys)
+    writer.int_array('graph.min_level_quests', graph.min_level_quests)
+    writer.int_array('graph.max_level_keys', graph.max_level_keys)
+    writer.int_array('graph.max_level_quests', graph.max_level_quests)
+
+    writer.write(path)
+    return path
+
+
+def search(count, key_at, wanted):
+    """Position of wanted among count case-folded sorted keys, or None"""
+    wanted = wanted.lower()
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        if key_at(middle).lower() < wanted:
+            low = middle + 1
+        else:
+            high = middle
+    if low < count and key_at(low).lower() == wanted:
+        return low
+    return None
+
+
+class ContentPack:
+    """A content pack mapped read-only into this process"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.map)
+
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a content pack")
+        header_length = HEADER_LENGTH.unpack_from(view, len(MAGIC))[0]
+        start = len(MAGIC) + HEADER_LENGTH.size
+        header = json.loads(bytes(view[start:start + header_length]))
+        body = start + header_length
+        body += -body % 8
+        self.sections = {
+            name: view[body + offset:body + offset + length]
+            for name, (offset, length) in header['sections'].items()
+        }
+        self.heap = self.sections['heap']
+
+        self.items = PackedTable(self, 'items')
+        self.enemies = PackedTable(self, 'enemies')
+        self.quests = PackedTable(self, 'quests')
+        self.quest_graph = PackedQuestGraph(self)
+
+    def ints(self, name):
+        return self.sections[name].cast('i')
+
+    def text(self, offset, length):
+        return str(self.heap[offset:offset + length], 'utf-8')
+
+
+class PackedTable(Mapping):
+    """Records looked up by key (case-insensitive) or by position"""
+
+    def __init__(self, pack, name):
+        self.pack = pack
+        self.fields = TABLE_FIELDS[name]
+        self.kinds = {field: (bit, kind) for bit, (field, kind) in enumerate(self.fields)}
+        self.layout = record_struct(self.fields)
+        self.records = pack.sections[f'{name}.records']
+        self.by_key = pack.ints(f'{name}.by_key')
+        self.key_offset = self._offset(TABLE_KEYS[name])
+
+    def _offset(self, field):
+        offset = 4
+        for name, kind in self.fields:
+            if name == field:
+                return offset
+            offset += 8
+        raise KeyError(field)
+
+    def __len__(self):
+        return len(self.by_key)
+
+    def key(self, index):
+        offset, length = STRING_REF.unpack_from(self.records, index * self.layout.size + self.key_offset)
+        return self.pack.text(offset, length)
+
+    def position(self, key):
+        found = search(len(self.by_key), lambda i: self.key(self.by_key[i]), key)
+        return None if found is None else self.by_key[found]
+
+    def __getitem__(self, key):
+        index = self.position(key)
+        if index is None:
+            raise KeyError(key)
+        return PackedRecord(self, index)
+
+    def __iter__(self):
+        for index in self.by_key:
+            yield self.key(index)
+
+    def record(self, index):
+        return PackedRecord(self, index)
+
+    def field(self, index, field):
+        bit, kind = self.kinds[field]
+        base = index * self.layout.size
+        if not struct.unpack_from('<I', self.records, base)[0] >> bit & 1:
+            raise KeyError(field)
+        offset = base + self._offset(field)
+        if kind == 'int':
+            return struct.unpack_from('<q', self.records, offset)[0]
+        text = self.pack.text(*STRING_REF.unpack_from(self.records, offset))
+        return json.loads(text) if kind == 'json' else text
+
+    def fields_of(self, index):
+        """All present fields of a record as a dict"""
+        values = self.layout.unpack_from(self.records, index * self.layout.size)
+        mask = values[0]
+        result = {}
+        position = 1
+        for bit, (field, kind) in enumerate(self.fields):
+            if kind == 'int':
+                raw = values[position]
+                position += 1
+            else:
+                raw = self.pack.text(values[position], values[position + 1])
+                position += 2
+            if mask >> bit & 1:
+                result[field] = json.loads(raw) if kind == 'json' else raw
+        return result
+
+
+class PackedRecord(Mapping):
+    """Read-only view of one record; reads like the dicts it was built from"""
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, field):
+        if field not in self.table.kinds:
+            raise KeyError(field)
+        return self.table.field(self.index, field)
+
+    def __iter__(self):
+        return iter(self.table.fields_of(self.index))
+
+    def __len__(self):
+        return len(self.table.fields_of(self.index))
+
+
+class PackedQuests:
+    """Quest definitions built from packed records on first access"""
+
+    def __init__(self, table):
+        self.table = table
+        # Only quests a player has actually been offered get built
+        self.built = {}
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, index):
+        quest = self.built.get(index)
+        if quest is None:
+            quest = self.built[index] = quest_from_spec(self.table.fields_of(index))
+        return quest
+
+
+class PackedStrings:
+    """Sorted string references; get(key) returns the key's position"""
+
+    def __init__(self, pack, name):
+        self.pack = pack
+        self.refs = pack.sections[name]
+
+    def key(self, position):
+        return self.pack.text(*STRING_REF.unpack_from(self.refs, position * STRING_REF.size))
+
+    def get(self, key, default=None):
+        found = search(len(self.refs) // STRING_REF.size, self.key, key)
+        return default if found is None else found
+
+
+class PackedQuestIndex:
+    """Quest name -> topological position"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def get(self, name, default=None):
+        index = self.table.position(name)
+        return default if index is None else index
+
+
+class PackedAdjacency:
+    """Reverse index: key -> quests it counts towards, as an int32 slice"""
+
+    def __init__(self, pack, name, positions):
+        self.positions = positions
+        self.offsets = pack.ints(f'{name}.offsets')
+        self.targets = pack.ints(f'{name}.targets')
+
+    def get(self, key, default=()):
+        position = self.positions.get(key)
+        if position is None:
+            return default
+        return self.targets[self.offsets[position]:self.offsets[position + 1]]
+
+
+class PackedQuestGraph:
+    """QuestGraph's interface over a content pack, for QuestUnlocks"""
+
+    def __init__(self, pack):
+        self.quests = PackedQuests(pack.quests)
+        self.index = PackedQuestIndex(pack.quests)
+        self.requirement_counts = pack.ints('graph.requirements')
+        self.after_quest = PackedAdjacency(pack, 'graph.after_quest', self.index)
+        self.after_item = PackedAdjacency(pack, 'graph.after_items', PackedStrings(pack, 'graph.items.keys'))
+        self.after_flag = PackedAdjacency(pack, 'graph.after_flags', PackedStrings(pack, 'graph.flags.keys'))
+        self.min_level_keys = pack.ints('graph.min_level_keys')
+        self.min_level_quests = pack.ints('graph.min_level_quests')
+        self.max_level_keys = pack.ints('graph.max_level_keys')
+        self.max_level_quests = pack.ints('graph.max_level_quests')
+
+    def unlocks_for(self, player):
+        return QuestUnlocks(self, player)
+
+
+def use_content_pack(path):
+    """Point enemy creation and quest managers in this process at a pack"""
+    pack = ContentPack(path)
+    CombatSystem.enemy_types = pack.enemies
+    QuestManager.catalog_graph = pack.quest_graph
+    return pack
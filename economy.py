@@ -0,0 +1,369 @@
+"""Shop and the shared market behind it.
+
+Every game session in a process trades with the one MARKET. Sessions never
+write market state: a trade is an Order appended to a queue, and a single
+writer drains it. Orders fill at the prices published by the last tick;
+only the tick moves every price and restocks every item, in one batched
+pass over the demand since the tick before:
+
+    price *= 1 + ELASTICITY * net_bought / (stock + LIQUIDITY)
+    price += REVERSION * (base - price)       # drift back towards the value
+    stock += RESTOCK * (starting - stock)     # merchants restock or sell on
+
+Prices are replaced wholesale at the end of a tick, so readers see one
+consistent price list without taking a lock. A game with no writer thread is
+the writer itself: its shop fills its orders as it places them, and it ticks
+once at the end of each turn. With many sessions in one process,
+`MARKET.start()` runs a background writer instead.
+
+Processes don't share a MARKET. Saving merges this process's price and stock
+changes since it last loaded or saved into whatever is on disk, so two games
+saving one file both keep their trades.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from events import GoldGained, ItemTraded
+from items import ITEMS
+
+MARKET_FILE = 'market.json'
+
+# Merchants pay this share of the asking price
+SELL_RATIO = 0.5
+# (starting stock, stock cap) by item type; other types are never stocked
+STOCK_BY_TYPE = {
+    'consumable': (20, 60),
+    'weapon': (2, 6),
+    'armor': (2, 6),
+    'accessory': (0, 3),
+}
+ELASTICITY = 0.05
+LIQUIDITY = 5
+REVERSION = 0.02
+RESTOCK = 0.05
+# Prices stay within these multiples of the item's value
+PRICE_FLOOR = 0.25
+PRICE_CEILING = 4.0
+
+
+class Order:
+    """A request to buy (quantity > 0) or sell (quantity < 0) one item type.
+
+    `limit` is the highest price a buyer pays or the lowest a seller takes.
+    The writer sets `status` to 'filled' or 'rejected' and `price` to the
+    per-unit price it filled at; an order given up on is 'cancelled'.
+    """
+    __slots__ = ('item_id', 'quantity', 'limit', 'status', 'price')
+
+    def __init__(self, item_id, quantity, limit, status=None):
+        self.item_id = item_id
+        self.quantity = quantity
+        self.limit = limit
+        self.status = status
+        self.price = None
+
+
+class Market:
+    def __init__(self, registry=ITEMS):
+        prototypes = registry.prototypes[:registry.stable_count]
+        self.names = [item['name'] for item in prototypes]
+        self.base = [float(item.get('value', 0)) for item in prototypes]
+        self.starting = []
+        self.caps = []
+        for item, value in zip(prototypes, self.base):
+            starting, cap = STOCK_BY_TYPE.get(item.get('type'), (0, 0)) if value else (0, 0)
+            self.starting.append(float(starting))
+            self.caps.append(cap)
+        self.floors = [value * PRICE_FLOOR for value in self.base]
+        self.ceilings = [value * PRICE_CEILING for value in self.base]
+
+        # Published by the writer. Prices are replaced, never mutated in place;
+        # fills adjust stock in place and each tick republishes it
+        self.prices = list(self.base)
+        self.stock = list(self.starting)
+        # As last loaded or saved; save() writes the changes since then
+        self.saved_prices = list(self.prices)
+        self.saved_stock = list(self.stock)
+        # Net units bought since the last repricing
+        self.bought = [0] * len(self.base)
+
+        # deque.append and popleft are atomic, so sessions enqueue without a lock
+        self.orders = deque()
+        self.settled = threading.Condition()
+        self.ticks = 0
+        self.filled = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.tick_seconds = 0.0
+        self.running = False
+        self.thread = None
+
+    # Quotes, read from the last published snapshot
+
+    def tradeable(self, item):
+        return item.id < len(self.base) and self.base[item.id] > 0
+
+    def buy_price(self, item):
+        return round(self.prices[item.id])
+
+    def sell_price(self, item):
+        return int(self.prices[item.id] * SELL_RATIO)
+
+    def in_stock(self, item):
+        return int(self.stock[item.id])
+
+    # Trading
+
+    def submit(self, item, quantity, limit):
+        """Queue an order for the next tick. Never blocks"""
+        if not self.tradeable(item):
+            return Order(item.id, quantity, limit, 'rejected')
+        order = Order(item.id, quantity, limit)
+        self.orders.append(order)
+        return order
+
+    def settle(self, order, timeout=1.0):
+        """Wait for the order to be filled or rejected; True if it filled.
+
+        Without a writer thread the caller fills the queue itself, at the
+        published prices and without repricing. If the writer doesn't get to
+        the order within `timeout` seconds it is cancelled, so a late tick
+        can't fill a trade the caller has already given up on.
+        """
+        if order.status is None:
+            if self.thread is None:
+                self.fill()
+            else:
+                with self.settled:
+                    if not self.settled.wait_for(lambda: order.status is not None, timeout):
+                        order.status = 'cancelled'
+                        self.cancelled += 1
+        return order.status == 'filled'
+
+    def fill(self):
+        """Fill the queued orders at the published prices, without repricing"""
+        orders = self.orders
+        prices = self.prices
+        caps = self.caps
+        stock = self.stock
+        bought = self.bought
+        filled = rejected = 0
+
+        # Held while filling so settle() can't cancel an order halfway through
+        with self.settled:
+            # Only orders queued before now; later ones wait for the next fill
+            for _ in range(len(orders)):
+                order = orders.popleft()
+                if order.status is not None:
+                    continue
+                i = order.item_id
+                quantity = order.quantity
+                if quantity > 0:
+                    price = round(prices[i])
+                    ok = stock[i] >= quantity and price <= order.limit
+                else:
+                    price = int(prices[i] * SELL_RATIO)
+                    ok = stock[i] - quantity <= caps[i] and price >= order.limit
+                if ok:
+                    stock[i] -= quantity
+                    bought[i] += quantity
+                    order.price = price
+                    order.status = 'filled'
+                    filled += 1
+                else:
+                    order.status = 'rejected'
+                    rejected += 1
+
+            self.filled += filled
+            self.rejected += rejected
+            self.settled.notify_all()
+
+    def tick(self):
+        """Fill the queued orders, then update every price and restock in one pass"""
+        started = time.perf_counter()
+        self.fill()
+
+        prices = self.prices
+        stock = self.stock
+        bought = self.bought
+        self.bought = [0] * len(bought)
+        self.prices = [
+            min(ceiling, max(floor, price * (1 + ELASTICITY * net / (units + LIQUIDITY)) + REVERSION * (base - price)))
+            for price, net, units, base, floor, ceiling
+            in zip(prices, bought, stock, self.base, self.floors, self.ceilings)
+        ]
+        self.stock = [units + RESTOCK * (starting - units) for units, starting in zip(stock, self.starting)]
+
+        self.ticks += 1
+        self.tick_seconds += time.perf_counter() - started
+
+    def idle_tick(self):
+        """Tick from a game turn unless a background writer owns the market"""
+        if self.thread is None:
+            self.tick()
+
+    # Background writer for many sessions in one process
+
+    def start(self, interval=0.005):
+        """Tick every `interval` seconds on a writer thread until stop()"""
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, args=(interval,), name='market', daemon=True)
+        self.thread.start()
+
+    def _run(self, interval):
+        while self.running:
+            self.tick()
+            time.sleep(interval)
+
+    def stop(self):
+        """Stop the writer and settle anything still queued"""
+        if self.thread is None:
+            return
+        self.running = False
+        self.thread.join()
+        self.thread = None
+        self.tick()
+
+    # Persistence, by item name so the catalog can grow between runs
+
+    def to_dict(self):
+        return {
+            name: [round(price, 2), round(units, 2)]
+            for name, price, units, base in zip(self.names, self.prices, self.stock, self.base)
+            if base
+        }
+
+    def parse(self, data, prices, stock):
+        """Prices and stock from `data`, falling back to the lists given"""
+        prices = list(prices)
+        stock = list(stock)
+        for i, name in enumerate(self.names):
+            if self.base[i] and name in data:
+                price, units = data[name]
+                prices[i] = min(self.ceilings[i], max(self.floors[i], price))
+                stock[i] = min(self.caps[i], max(0, units))
+        return prices, stock
+
+    def from_dict(self, data):
+        self.prices, self.stock = self.parse(data, self.prices, self.stock)
+        # Copies, since fills adjust the published stock in place
+        self.saved_prices = list(self.prices)
+        self.saved_stock = list(self.stock)
+
+    def merge(self, data):
+        """Apply the changes since the last load or save on top of `data`"""
+        prices, stock = self.parse(data, self.saved_prices, self.saved_stock)
+        self.prices = [
+            min(ceiling, max(floor, theirs + mine - saved))
+            for theirs, mine, saved, floor, ceiling
+            in zip(prices, self.prices, self.saved_prices, self.floors, self.ceilings)
+        ]
+        self.stock = [
+            min(cap, max(0, theirs + mine - saved))
+            for theirs, mine, saved, cap in zip(stock, self.stock, self.saved_stock, self.caps)
+        ]
+        self.saved_prices = list(self.prices)
+        self.saved_stock = list(self.stock)
+
+    def load(self, path):
+        try:
+            with open(path) as f:
+                self.from_dict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load market prices: {e}")
+
+    def save(self, path):
+        """Merge into the file at `path` rather than overwrite other games' trades"""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with _file_lock(path + '.lock'):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            self.merge(data)
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(self.to_dict(), f, separators=(',', ':'))
+            os.replace(temp_path, path)
+
+
+@contextmanager
+def _file_lock(path, timeout=5.0):
+    """Hold `path` as a lock file; a lock older than `timeout` is taken as stale"""
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > timeout:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.remove(path)
+
+
+MARKET = Market()
+
+
+class Shop:
+    """One game's counter at the shared market"""
+
+    def __init__(self, market=MARKET):
+        self.market = market
+
+    def wares(self):
+        """Catalog items the market has in stock"""
+        market = self.market
+        return [item for item in ITEMS.prototypes[:len(market.base)]
+                if market.tradeable(item) and market.in_stock(item) >= 1]
+
+    def buy(self, player, item):
+        price = self.market.buy_price(item)
+        if player.gold < price:
+            print(f"❌ You need {price} gold for {item['name']}!")
+            return False
+
+        order = self.market.submit(item, 1, price)
+        if not self.market.settle(order):
+            print(f"❌ The merchant can't sell you {item['name']} right now.")
+            return False
+
+        player.gold -= order.price
+        player.add_item(item)
+        player.bus.defer(ItemTraded(player, item, 1, order.price))
+        print(f"🛒 Bought {item['name']} for {order.price} gold!")
+        return True
+
+    def sell(self, player, item):
+        if not self.market.tradeable(item):
+            print(f"❌ The merchant won't buy {item['name']}.")
+            return False
+
+        order = self.market.submit(item, -1, self.market.sell_price(item))
+        if not self.market.settle(order):
+            print(f"❌ The merchant has no room for more {item['name']}.")
+            return False
+
+        player.inventory.remove(item)
+        player.gold += order.price
+        player.bus.defer(GoldGained(player, order.price, 'sale'))
+        player.bus.defer(ItemTraded(player, item, -1, order.price))
+        print(f"💰 Sold {item['name']} for {order.price} gold!")
+        return True
@@ -0,0 +1,244 @@
+"""Game events: typed topics, the per-game event bus and the event stream.
+
+Characters, combat and quests publish typed events on the bus of the game
+they belong to (`player.bus`); quests, achievements, run history and autosave
+subscribe to the topics they care about. Events that feed game rules are
+deferred and dispatched once per turn by `EventBus.flush`:
+
+    self.bus.defer(LevelUp(self, self.level))
+
+High-volume events are only built when someone is listening:
+
+    if player.bus.wants(DamageDealt):
+        player.bus.publish(DamageDealt(player, enemy, actual_damage, 'attack'))
+
+The shared EVENTS stream can subscribe to a bus to keep recent events in a
+fixed-size ring buffer and persist them for offline analysis as JSON Lines or
+a compact binary format.
+"""
+import json
+import struct
+import time
+from collections import deque, namedtuple
+from collections.abc import Mapping
+
+DamageDealt = namedtuple('DamageDealt', 'source target amount kind')
+LootDropped = namedtuple('LootDropped', 'player enemy item')
+LevelUp = namedtuple('LevelUp', 'player level')
+QuestCompleted = namedtuple('QuestCompleted', 'player quest')
+EnemyKilled = namedtuple('EnemyKilled', 'player enemy_type')
+FightEnded = namedtuple('FightEnded', 'player enemy_type outcome gold exp')
+GoldGained = namedtuple('GoldGained', 'player amount source')
+ItemAdded = namedtuple('ItemAdded', 'player item')
+WeaponEquipped = namedtuple('WeaponEquipped', 'player item')
+AchievementUnlocked = namedtuple('AchievementUnlocked', 'player achievement')
+ItemTraded = namedtuple('ItemTraded', 'player item quantity price')
+
+# Binary type codes; append only so existing logs stay readable
+EVENT_TYPES = [
+    DamageDealt, LootDropped, LevelUp, QuestCompleted, EnemyKilled,
+    FightEnded, GoldGained, ItemAdded, WeaponEquipped, AchievementUnlocked,
+    ItemTraded,
+]
+EVENT_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+
+def plain(value):
+    """Characters, enemies, quests and items are logged by name"""
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    if isinstance(value, Mapping):
+        return value['name']
+    return getattr(value, 'name', str(value))
+
+
+class EventBus:
+    """In-process publish/subscribe with one handler list per event type"""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.queue = []
+
+    def subscribe(self, topic, handler):
+        self.subscribers.setdefault(topic, []).append(handler)
+
+    def unsubscribe(self, topic, handler):
+        handlers = self.subscribers.get(topic, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self.subscribers.pop(topic, None)
+
+    def wants(self, topic):
+        return topic in self.subscribers
+
+    def publish(self, event):
+        """Dispatch to subscribers right away"""
+        handlers = self.subscribers.get(type(event))
+        if handlers:
+            for handler in list(handlers):
+                handler(event)
+
+    def defer(self, event):
+        """Queue an event until the end of the turn"""
+        if type(event) in self.subscribers:
+            self.queue.append(event)
+
+    def flush(self):
+        """Dispatch queued events in order, including any queued meanwhile"""
+        while self.queue:
+            queue, self.queue = self.queue, []
+            for event in queue:
+                self.publish(event)
+
+
+# Shared by characters that are not part of a game; never subscribe to it
+DETACHED_BUS = EventBus()
+
+
+class EventStream:
+    def __init__(self, capacity=10000):
+        self.ring = deque(maxlen=capacity)
+        self.sinks = []
+        self.recording = False
+        self.enabled = False
+
+    def _update_enabled(self):
+        self.enabled = self.recording or bool(self.sinks)
+
+    def record(self, on=True):
+        """Keep recent events in the ring buffer"""
+        self.recording = on
+        self._update_enabled()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        self._update_enabled()
+        return sink
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+        sink.close()
+        self._update_enabled()
+
+    def attach(self, bus):
+        """Receive every event published on a game's bus"""
+        for event_type in EVENT_TYPES:
+            bus.subscribe(event_type, self.emit)
+
+    def emit(self, event):
+        timestamp = time.time()
+        if self.recording:
+            self.ring.append((timestamp, event))
+        for sink in self.sinks:
+            sink.write(timestamp, event)
+
+    def recent(self, count=None):
+        """Most recent (timestamp, event) pairs, oldest first"""
+        events = list(self.ring)
+        return events if count is None else events[-count:]
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+        self._update_enabled()
+
+
+class JsonLinesSink:
+    """One JSON object per line, written in batches"""
+
+    def __init__(self, filename, batch_size=1000):
+        self.file = open(filename, 'a')
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def write(self, timestamp, event):
+        record = {field: plain(value) for field, value in zip(event._fields, event)}
+        record['type'] = type(event).__name__
+        record['t'] = timestamp
+        self.buffer.append(json.dumps(record))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write('\n'.join(self.buffer) + '\n')
+            self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+RECORD_HEADER = struct.Struct('<Bd')
+INT_FIELD = struct.Struct('<q')
+STR_LENGTH = struct.Struct('<H')
+
+
+class BinarySink:
+    """Compact records: type code, timestamp, then each field.
+
+    Each field is tagged b'i' for an 8-byte signed int or b's' for UTF-8 text
+    with a 2-byte length prefix. Use read_binary to load them back.
+    """
+
+    def __init__(self, filename, batch_bytes=1 << 16):
+        self.file = open(filename, 'ab')
+        self.batch_bytes = batch_bytes
+        self.buffer = bytearray()
+
+    def write(self, timestamp, event):
+        buffer = self.buffer
+        buffer += RECORD_HEADER.pack(EVENT_CODES[type(event)], timestamp)
+        for value in event:
+            if isinstance(value, int):
+                buffer += b'i' + INT_FIELD.pack(value)
+            else:
+                encoded = str(plain(value)).encode('utf-8')
+                buffer += b's' + STR_LENGTH.pack(len(encoded)) + encoded
+        if len(buffer) >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.buffer = bytearray()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def read_binary(filename):
+    """Yield (timestamp, event) pairs from a BinarySink file"""
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    offset = 0
+    while offset < len(data):
+        code, timestamp = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        event_type = EVENT_TYPES[code]
+        values = []
+        for _ in event_type._fields:
+            kind = data[offset:offset + 1]
+            offset += 1
+            if kind == b'i':
+                values.append(INT_FIELD.unpack_from(data, offset)[0])
+                offset += INT_FIELD.size
+            else:
+                length = STR_LENGTH.unpack_from(data, offset)[0]
+                offset += STR_LENGTH.size
+                values.append(data[offset:offset + length].decode('utf-8'))
+                offset += length
+        yield timestamp, event_type(*values)
+
+
+EVENTS = EventStream()
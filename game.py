@@ -1,30 +1,73 @@
 from character import Character
 from combat import CombatSystem
 from quests import QuestManager
+from history import RunHistory
+from autosave import AutoSaver
+from save_history import SaveHistory
+from achievements import AchievementTracker
+from commands import COMMANDS, DEFAULT_STOP_BELOW, MacroSummary, parse_macro
+from economy import MARKET, MARKET_FILE, Shop
+from events import EVENTS, EventBus, FightEnded, GoldGained, JsonLinesSink, LevelUp, QuestCompleted
 
 import os
 import sys
+from contextlib import redirect_stdout
+import time
 import random
 
 class RPGGame:
-    def __init__(self):
+    def __init__(self, save_dir='saves', interactive=True):
         self.player = None
+        self.save_dir = save_dir
+        # Non-interactive games (bots) skip the "Press Enter" pauses
+        self.interactive = interactive
+        # Optional choose_action(player, enemy) used instead of the combat menu
+        self.combat_policy = None
+        # Queued commands and macros stop below this fraction of max HP
+        self.stop_below = DEFAULT_STOP_BELOW
+        self.stop_reason = None
         self.quest_manager = QuestManager()
+        self.history = RunHistory(os.path.join(save_dir, 'history.db'))
+        self.save_history = SaveHistory(os.path.join(save_dir, 'history'))
+        self.autosaver = AutoSaver(save_dir, history=self.save_history)
+        self.achievements = AchievementTracker()
+        # Every session in this process trades with the same market
+        self.market = MARKET
+        self.shop = Shop(self.market)
+        
+        # Side effects of play are wired up here rather than called directly
+        self.bus = EventBus()
+        self.quest_manager.attach(self.bus)
+        self.history.attach(self.bus)
+        self.achievements.attach(self.bus)
+        self.bus.subscribe(FightEnded, self.on_safe_point)
+        self.bus.subscribe(QuestCompleted, self.on_safe_point)
+        self.bus.subscribe(LevelUp, self.on_stop_event)
+        self.bus.subscribe(QuestCompleted, self.on_stop_event)
+        if EVENTS.enabled:
+            EVENTS.attach(self.bus)
         
     def start(self):
         print("Welcome to the Text-Based RPG Adventure!")
+        COMMANDS.guard = self.low_health
         self.create_character()
         self.main_menu()
         
     def create_character(self):
         print("\nCreate Your Character")
-        name = input("Enter character name: ")
+        name = COMMANDS.read("Enter character name: ")
         print("Choose your class: Warrior, Mage, Rogue")
-        character_class = input("Character class: ")
+        character_class = COMMANDS.read("Character class: ")
         
-        self.player = Character(name, character_class)
+        self.attach_player(Character(name, character_class))
+        self.history.start_session(self.player)
         print(f"\nWelcome, {self.player.name} the {self.player.character_class}!")
         
+    def attach_player(self, player):
+        """Make player the active character, publishing on this game's bus"""
+        player.bus = self.bus
+        self.player = player
+        
     def main_menu(self):
         while True:
             print("\nMain Menu")
@@ -33,10 +76,21 @@ class RPGGame:
             print("3. Quests")
             print("4. Save Game")
             print("5. Load Game")
-            print("6. Exit")
-            choice = input("Choose an option: ").strip()
+            print("6. Leaderboard")
+            print("7. Shop")
+            print("8. Exit")
+            print("Chain commands with ';' or run a macro, e.g. explore x50 --auto-attack --stop-below 30%hp")
+            choice = COMMANDS.read("Choose an option: ").strip()
             
-            if choice == "1":
+            try:
+                macro = parse_macro(choice)
+            except ValueError as e:
+                print(f"❌ {e}")
+                continue
+            
+            if macro:
+                self.run_macro(macro)
+            elif choice == "1":
                 self.view_character()
             elif choice == "2":
                 self.explore_world()
@@ -47,6 +101,14 @@ class RPGGame:
             elif choice == "5":
                 self.load_game()
             elif choice == "6":
+                self.view_leaderboard()
+            elif choice == "7":
+                self.visit_shop()
+            elif choice == "8":
+                self.autosaver.close()
+                self.market.save(os.path.join(self.save_dir, MARKET_FILE))
+                EVENTS.close()
+                self.history.end_session(self.player)
                 print("Thanks for playing!")
                 break
             else:
@@ -63,7 +125,7 @@ class RPGGame:
         print("3. Use Item")
         print("4. Return to Main Menu")
         
-        choice = input("Choose an option: ").strip()
+        choice = COMMANDS.read("Choose an option: ").strip()
         
         if choice == "1":
             self.equip_weapon()
@@ -83,17 +145,11 @@ class RPGGame:
             print(f"{i}. {weapon['name']} (+{weapon['damage']} damage) - {weapon['description']}")
             
         try:
-            choice = int(input("Choose weapon to equip (0 to cancel): "))
+            choice = int(COMMANDS.read("Choose weapon to equip (0 to cancel): "))
             if choice == 0:
                 return
             if 1 <= choice <= len(weapons):
-                weapon = weapons[choice - 1]
-                self.player.inventory.remove(weapon)
-                self.player.equip_weapon(weapon)
-                print(f"⚔️ Equipped {weapon['name']}!")
-                
-                # Update quest progress
-                self.quest_manager.update_quest_progress(self.player, "weapon_equipped")
+                self.equip(weapons[choice - 1])
         except ValueError:
             print("❌ Invalid choice!")
     
@@ -108,14 +164,11 @@ class RPGGame:
             print(f"{i}. {armor['name']} (+{armor['defense']} defense) - {armor['description']}")
             
         try:
-            choice = int(input("Choose armor to equip (0 to cancel): "))
+            choice = int(COMMANDS.read("Choose armor to equip (0 to cancel): "))
             if choice == 0:
                 return
             if 1 <= choice <= len(armors):
-                armor = armors[choice - 1]
-                self.player.inventory.remove(armor)
-                self.player.equip_armor(armor)
-                print(f"🛡️ Equipped {armor['name']}!")
+                self.equip(armors[choice - 1])
         except ValueError:
             print("❌ Invalid choice!")
     
@@ -130,17 +183,31 @@ class RPGGame:
             print(f"{i}. {item['name']} - {item['description']}")
             
         try:
-            choice = int(input("Choose item to use (0 to cancel): "))
+            choice = int(COMMANDS.read("Choose item to use (0 to cancel): "))
             if choice == 0:
                 return
             if 1 <= choice <= len(consumables):
-                item = consumables[choice - 1]
-                if 'heal' in item:
-                    healed = self.player.heal(item['heal'])
-                    print(f"💚 Used {item['name']} and recovered {healed} HP!")
-                    self.player.inventory.remove(item)
+                self.consume(consumables[choice - 1])
         except ValueError:
             print("❌ Invalid choice!")
+    
+    def equip(self, item):
+        """Equip a weapon or armor from the inventory"""
+        self.player.inventory.remove(item)
+        if item.get('type') == 'weapon':
+            self.player.equip_weapon(item)
+            print(f"⚔️ Equipped {item['name']}!")
+        else:
+            self.player.equip_armor(item)
+            print(f"🛡️ Equipped {item['name']}!")
+        self.end_turn()
+    
+    def consume(self, item):
+        """Use a consumable from the inventory outside of combat"""
+        if 'heal' in item:
+            healed = self.player.heal(item['heal'])
+            print(f"💚 Used {item['name']} and recovered {healed} HP!")
+            self.player.inventory.remove(item)
         
     def explore_world(self):
         print("\n🌍 You venture into the wilderness...")
@@ -157,10 +224,7 @@ class RPGGame:
                 
             enemy = CombatSystem.create_enemy(enemy_type, self.player.level)
             
-            if CombatSystem.combat_encounter(self.player, enemy):
-                # Update quest progress for kills
-                self.quest_manager.update_quest_progress(self.player, "kill", enemy_type)
-                
+            if CombatSystem.combat_encounter(self.player, enemy, self.combat_policy):
                 # Check if player died
                 if not self.player.is_alive():
                     print("\n💀 GAME OVER 💀")
@@ -173,11 +237,85 @@ class RPGGame:
             gold_found = random.randint(10, 30)
             self.player.gold += gold_found
             print(f"💰 Found {gold_found} gold!")
-            
-            # Update quest progress for gold
-            self.quest_manager.update_quest_progress(self.player, "gold_gained", None, gold_found)
-            
-        input("\nPress Enter to continue...")
+            self.bus.defer(GoldGained(self.player, gold_found, 'explore'))
+        
+        self.end_turn()
+        if self.interactive and not COMMANDS.pending:
+            COMMANDS.read("\nPress Enter to continue...")
+        
+    def end_turn(self):
+        """Dispatch the events queued up during this action"""
+        self.bus.flush()
+        self.market.idle_tick()
+    
+    def on_stop_event(self, event):
+        if isinstance(event, LevelUp):
+            reason = f"reached level {event.level}"
+        else:
+            reason = f"completed {event.quest.name}"
+        self.stop_reason = reason
+        COMMANDS.cancel(reason)
+    
+    def low_health(self):
+        """Reason to stop grinding if health has dropped below the threshold"""
+        if self.player and self.player.current_health < self.player.max_health * self.stop_below:
+            return f"health below {self.stop_below:.0%}"
+        return None
+    
+    def macro_stop_reason(self):
+        """Why a macro must not run another action, or None"""
+        if not self.player.is_alive():
+            return "you were defeated"
+        return self.stop_reason or self.low_health()
+    
+    def macro_combat_action(self, macro, player, enemy):
+        """The macro's policy until health drops below the stop threshold mid-fight.
+        
+        Then drink the best healing potion, or flee without one, and stop the
+        macro once the fight is over.
+        """
+        reason = self.low_health()
+        if reason is None:
+            return macro.policy, None
+        self.stop_reason = f"{reason} during a fight"
+        potions = [item for item in player.inventory if item.get('type') == 'consumable' and 'heal' in item]
+        if potions:
+            return "item", max(potions, key=lambda item: item['heal'])
+        return "flee", None
+    
+    def run_macro(self, macro):
+        """Repeat an action with a fixed combat policy, then print a summary"""
+        summary = MacroSummary()
+        summary.attach(self.bus)
+        saved = self.combat_policy, self.interactive, self.stop_below, CombatSystem.round_delay
+        self.combat_policy = lambda player, enemy: self.macro_combat_action(macro, player, enemy)
+        self.interactive = False
+        self.stop_below = macro.stop_below
+        self.stop_reason = None
+        CombatSystem.round_delay = 0
+        
+        print(f"\n🔁 Running {macro.action} x{macro.count}...")
+        try:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if macro.verbose else devnull):
+                # Checked before every run, so a macro started too hurt does nothing
+                while summary.runs < macro.count:
+                    summary.stop_reason = self.macro_stop_reason()
+                    if summary.stop_reason:
+                        break
+                    self.explore_world()
+                    summary.runs += 1
+        finally:
+            self.combat_policy, self.interactive, self.stop_below, CombatSystem.round_delay = saved
+            summary.detach(self.bus)
+        summary.display(macro, self.player)
+    
+    def on_safe_point(self, event):
+        self.autosave()
+    
+    def autosave(self):
+        """Hand a snapshot to the background writer at a safe point"""
+        if self.player and self.player.is_alive():
+            self.autosaver.snapshot(self.player)
         
     def manage_quests(self):
         while True:
@@ -186,11 +324,11 @@ class RPGGame:
             print("2. View Active Quests")
             print("3. View Completed Quests")
             print("4. Return to Main Menu")
-            choice = input("Choose an option: ").strip()
+            choice = COMMANDS.read("Choose an option: ").strip()
             
             if choice == "1":
-                self.quest_manager.display_available_quests(self.player.level)
-                quest_choice = input("Choose a quest to start or press Enter to cancel: ").strip()
+                self.quest_manager.display_available_quests(self.player)
+                quest_choice = COMMANDS.read("Choose a quest to start or press Enter to cancel: ").strip()
                 if quest_choice.isdigit():
                     index = int(quest_choice) - 1
                     if not self.quest_manager.assign_quest(self.player, index):
@@ -205,43 +343,175 @@ class RPGGame:
                 print("Invalid choice. Try again.")
         
     def save_game(self):
-        if not os.path.exists('saves'):
-            os.makedirs('saves')
+        if not os.path.exists(self.save_dir):
+            os.makedirs(self.save_dir)
         
-        save_filename = f'saves/{self.player.name}_lvl{self.player.level}.sav'
+        save_filename = os.path.join(self.save_dir, f'{self.player.name}_lvl{self.player.level}.sav')
         self.player.save_to_file(save_filename)
+        self.save_history.record(self.player)
         print(f"Game saved as {save_filename}")
     
     def load_game(self):
-        if not os.path.exists('saves'):
+        if not os.path.exists(self.save_dir):
             print("No saved games found.")
             return
             
-        files = [f for f in os.listdir('saves') if f.endswith('.sav')]
-        if not files:
+        files = [f for f in os.listdir(self.save_dir) if f.endswith('.sav')]
+        has_history = bool(self.save_history.characters())
+        if not files and not has_history:
             print("No saved games found.")
             return
         
         print("Available Saves:")
         for i, file in enumerate(files, 1):
             print(f"{i}. {file}")
+        if has_history:
+            print("H. Browse save history")
         
-        choice = input("Enter save number to load or press Enter to cancel: ").strip()
+        choice = COMMANDS.read("Enter save number to load or press Enter to cancel: ").strip()
         if choice.isdigit():
             index = int(choice) - 1
             if 0 <= index < len(files):
-                filename = f'saves/{files[index]}'
-                self.player = Character.load_from_file(filename)
+                filename = os.path.join(self.save_dir, files[index])
+                self.switch_player(Character.load_from_file(filename))
                 print(f"Loaded {filename}")
             else:
                 print("Invalid choice.")
+        elif choice.lower() == "h" and has_history:
+            self.load_from_history()
+        else:
+            print("Cancelled loading.")
+    
+    def load_from_history(self):
+        characters = self.save_history.characters()
+        print("\n📜 Save History:")
+        for i, name in enumerate(characters, 1):
+            print(f"{i}. {name}")
+        
+        choice = COMMANDS.read("Choose a character or press Enter to cancel: ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(characters):
+            print("Cancelled loading.")
+            return
+        name = characters[int(choice) - 1]
+        
+        snapshots = self.save_history.snapshots(name)
+        for i, entry in enumerate(snapshots, 1):
+            saved_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['time']))
+            kind = " (autosave)" if entry.get('kind') == 'autosave' else ""
+            print(f"{i}. {saved_at} - Level {entry['level']}{kind}")
+        
+        choice = COMMANDS.read("Choose a save to restore or press Enter to cancel: ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(snapshots):
+            self.switch_player(self.save_history.restore(name, int(choice) - 1))
+            print(f"Restored {name} from save {choice}")
         else:
             print("Cancelled loading.")
+    
+    def switch_player(self, player):
+        """Replace the active character, resuming its run history session"""
+        self.history.end_session(self.player)
+        self.attach_player(player)
+        self.history.resume_session(self.player)
+    
+    def visit_shop(self):
+        while True:
+            print(f"\n🏪 Shop (you have {self.player.gold} gold)")
+            print("1. Buy")
+            print("2. Sell")
+            print("3. Return to Main Menu")
+            
+            choice = COMMANDS.read("Choose an option: ").strip()
+            
+            if choice == "1":
+                self.buy_item()
+            elif choice == "2":
+                self.sell_item()
+            elif choice == "3":
+                break
+            else:
+                print("Invalid choice. Try again.")
+    
+    def buy_item(self):
+        wares = self.shop.wares()
+        if not wares:
+            print("❌ The shop is sold out!")
+            return
+        
+        print("\nFor Sale:")
+        for i, item in enumerate(wares, 1):
+            print(f"{i}. {item['name']} - {self.market.buy_price(item)} gold "
+                  f"({self.market.in_stock(item)} in stock) - {item['description']}")
+        
+        try:
+            choice = int(COMMANDS.read("Choose item to buy (0 to cancel): "))
+            if choice == 0:
+                return
+            if 1 <= choice <= len(wares) and self.shop.buy(self.player, wares[choice - 1]):
+                self.end_turn()
+        except ValueError:
+            print("❌ Invalid choice!")
+    
+    def sell_item(self):
+        goods = [item for item in self.player.inventory if self.market.tradeable(item)]
+        if not goods:
+            print("❌ Nothing to sell!")
+            return
+        
+        print("\nThe merchant offers:")
+        for i, item in enumerate(goods, 1):
+            print(f"{i}. {item['name']} - {self.market.sell_price(item)} gold")
+        
+        try:
+            choice = int(COMMANDS.read("Choose item to sell (0 to cancel): "))
+            if choice == 0:
+                return
+            if 1 <= choice <= len(goods) and self.shop.sell(self.player, goods[choice - 1]):
+                self.end_turn()
+        except ValueError:
+            print("❌ Invalid choice!")
+    
+    def view_leaderboard(self):
+        self.history.flush(self.player)
+        
+        print("\n🏆 Leaderboard")
+        print("\nTop Levels by Class:")
+        top_levels = self.history.top_levels_by_class()
+        if not top_levels:
+            print("  No runs recorded yet.")
+        for character_class, entries in top_levels.items():
+            print(f"  {character_class.title()}:")
+            for name, level in entries:
+                print(f"    {name} - Level {level}")
+        
+        print("\nFastest Dragon Slayers:")
+        fastest = self.history.fastest_quest("Dragon Slayer")
+        if not fastest:
+            print("  No dragons slain yet.")
+        for name, character_class, seconds in fastest:
+            minutes, secs = divmod(int(seconds), 60)
+            print(f"  {name} the {character_class.title()} - {minutes}m {secs}s")
+        
+        print("\nDeath Rate by Enemy:")
+        rates = self.history.death_rates()
+        if not rates:
+            print("  No fights recorded yet.")
+        for enemy_type, fights, rate in rates:
+            print(f"  {enemy_type.title()}: {rate:.0%} of {fights} fights")
 
 if __name__ == '__main__':
+    # Set RPG_EVENT_LOG=events.jsonl to record structured game events
+    if os.environ.get('RPG_EVENT_LOG'):
+        EVENTS.add_sink(JsonLinesSink(os.environ['RPG_EVENT_LOG']))
+    
+    MARKET.load(os.path.join('saves', MARKET_FILE))
     game = RPGGame()
     try:
         game.start()
     except KeyboardInterrupt:
+        game.autosaver.close()
+        game.market.save(os.path.join(game.save_dir, MARKET_FILE))
+        EVENTS.close()
+        if game.player:
+            game.history.close(game.player)
         print("\nGame exited.")
         sys.exit(0)
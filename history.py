@@ -0,0 +1,248 @@
+import os
+import sqlite3
+import time
+
+from events import FightEnded, GoldGained, QuestCompleted
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    character_name TEXT NOT NULL,
+    character_class TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    final_level INTEGER NOT NULL DEFAULT 1,
+    gold_earned INTEGER NOT NULL DEFAULT 0,
+    quests_completed INTEGER NOT NULL DEFAULT 0,
+    died INTEGER NOT NULL DEFAULT 0,
+    character_id TEXT,
+    played_seconds REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS fights (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    enemy_type TEXT NOT NULL,
+    player_level INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    gold INTEGER NOT NULL,
+    exp INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quest_completions (
+    session_id INTEGER NOT NULL,
+    quest_name TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS enemy_stats (
+    enemy_type TEXT PRIMARY KEY,
+    fights INTEGER NOT NULL DEFAULT 0,
+    deaths INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_class_level ON sessions (character_class, final_level DESC);
+CREATE INDEX IF NOT EXISTS idx_fights_session ON fights (session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_character ON sessions (character_id);
+CREATE INDEX IF NOT EXISTS idx_quest_completions_time ON quest_completions (quest_name, seconds);
+"""
+
+# Columns added after the first release, for databases created before them
+MIGRATIONS = {
+    'character_id': "ALTER TABLE sessions ADD COLUMN character_id TEXT",
+    'played_seconds': "ALTER TABLE sessions ADD COLUMN played_seconds REAL NOT NULL DEFAULT 0",
+}
+
+
+class RunHistory:
+    """Local SQLite store of session and fight summaries.
+
+    Fights and quest completions are buffered in memory and written in a
+    single transaction once `batch_size` events have piled up, or when the
+    session ends. Per-enemy death counts are kept in a small aggregate table
+    so leaderboard queries never have to scan the fights table.
+    """
+
+    def __init__(self, db_path='saves/history.db', batch_size=64):
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+        self.batch_size = batch_size
+
+        self.session_id = None
+        self.session_start = None
+        self.gold_earned = 0
+        self.quests_completed = 0
+        self.died = False
+        self.pending_fights = []
+        self.pending_quests = []
+
+    def _migrate(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(sessions)")}
+        if columns:
+            with self.conn:
+                for column, statement in MIGRATIONS.items():
+                    if column not in columns:
+                        self.conn.execute(statement)
+
+    def start_session(self, player):
+        """Open a new session for the given character"""
+        if self.session_id is not None:
+            self.end_session(player)
+
+        self.session_start = time.time()
+        self.gold_earned = 0
+        self.quests_completed = 0
+        self.died = False
+        cursor = self.conn.execute(
+            "INSERT INTO sessions (character_name, character_class, character_id, started_at, final_level) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (player.name, player.character_class.lower(), player.character_id, self.session_start, player.level)
+        )
+        self.session_id = cursor.lastrowid
+        self.conn.commit()
+
+    def resume_session(self, player):
+        """Continue the latest session of a loaded character, or open a new one"""
+        if self.session_id is not None:
+            self.end_session(player)
+
+        row = self.conn.execute(
+            "SELECT id, played_seconds, gold_earned, quests_completed, died FROM sessions "
+            "WHERE character_id = ? ORDER BY id DESC LIMIT 1",
+            (player.character_id,)
+        ).fetchone()
+        if row is None:
+            self.start_session(player)
+            return
+
+        self.session_id, played_seconds, self.gold_earned, self.quests_completed, died = row
+        # Quest times count play time only, not the time the game was closed
+        self.session_start = time.time() - played_seconds
+        self.died = bool(died)
+        with self.conn:
+            self.conn.execute("UPDATE sessions SET ended_at = NULL WHERE id = ?", (self.session_id,))
+
+    def record_fight(self, player, enemy_type, outcome, gold=0, exp=0):
+        """Queue a fight summary. Outcome is 'won', 'fled' or 'died'"""
+        if self.session_id is None:
+            return
+        self.pending_fights.append((self.session_id, enemy_type, player.level, outcome, gold, exp))
+        if outcome == 'died':
+            self.died = True
+        self._maybe_flush(player)
+
+    def record_gold(self, player, amount):
+        self.gold_earned += amount
+
+    def record_quest(self, player, quest):
+        """Queue a quest completion with the time since the session began"""
+        if self.session_id is None:
+            return
+        seconds = time.time() - self.session_start
+        self.pending_quests.append((self.session_id, quest.name, seconds))
+        self.quests_completed += 1
+        self._maybe_flush(player)
+
+    def attach(self, bus):
+        """Record fights, gold and quest completions published on a game's bus"""
+        bus.subscribe(FightEnded, lambda e: self.record_fight(e.player, e.enemy_type, e.outcome, e.gold, e.exp))
+        bus.subscribe(GoldGained, lambda e: self.record_gold(e.player, e.amount))
+        bus.subscribe(QuestCompleted, lambda e: self.record_quest(e.player, e.quest))
+
+    def _maybe_flush(self, player):
+        if len(self.pending_fights) + len(self.pending_quests) >= self.batch_size:
+            self.flush(player)
+
+    def flush(self, player=None):
+        """Write all buffered events in one transaction"""
+        if self.session_id is None:
+            return
+
+        deaths = {}
+        for fight in self.pending_fights:
+            counts = deaths.setdefault(fight[1], [0, 0])
+            counts[0] += 1
+            if fight[3] == 'died':
+                counts[1] += 1
+
+        with self.conn:
+            if self.pending_fights:
+                self.conn.executemany(
+                    "INSERT INTO fights (session_id, enemy_type, player_level, outcome, gold, exp) VALUES (?, ?, ?, ?, ?, ?)",
+                    self.pending_fights
+                )
+            if self.pending_quests:
+                self.conn.executemany(
+                    "INSERT INTO quest_completions (session_id, quest_name, seconds) VALUES (?, ?, ?)",
+                    self.pending_quests
+                )
+            for enemy_type, (fights, died) in deaths.items():
+                self.conn.execute("INSERT OR IGNORE INTO enemy_stats (enemy_type) VALUES (?)", (enemy_type,))
+                self.conn.execute(
+                    "UPDATE enemy_stats SET fights = fights + ?, deaths = deaths + ? WHERE enemy_type = ?",
+                    (fights, died, enemy_type)
+                )
+            if player is not None:
+                self.conn.execute(
+                    "UPDATE sessions SET final_level = MAX(final_level, ?), gold_earned = ?, quests_completed = ?, "
+                    "died = ?, played_seconds = ? WHERE id = ?",
+                    (player.level, self.gold_earned, self.quests_completed, int(self.died),
+                     time.time() - self.session_start, self.session_id)
+                )
+
+        self.pending_fights = []
+        self.pending_quests = []
+
+    def end_session(self, player):
+        """Flush pending events and close out the current session"""
+        if self.session_id is None:
+            return
+        self.flush(player)
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE sessions SET ended_at = ?, played_seconds = ? WHERE id = ?",
+                (now, now - self.session_start, self.session_id)
+            )
+        self.session_id = None
+
+    def close(self, player=None):
+        if player is not None:
+            self.end_session(player)
+        self.conn.close()
+
+    # Leaderboard queries
+
+    def top_levels_by_class(self, limit=3):
+        """Highest level each character reached, best `limit` per class"""
+        leaderboard = {}
+        for character_class, name, level in self.conn.execute(
+            "SELECT character_class, character_name, level FROM ("
+            "  SELECT character_class, character_name, MAX(final_level) AS level, ROW_NUMBER() OVER ("
+            "    PARTITION BY character_class ORDER BY MAX(final_level) DESC, character_name) AS rank"
+            "  FROM sessions GROUP BY character_class, COALESCE(character_id, character_name)"
+            ") WHERE rank <= ? ORDER BY character_class, rank",
+            (limit,)
+        ):
+            leaderboard.setdefault(character_class, []).append((name, level))
+        return leaderboard
+
+    def fastest_quest(self, quest_name="Dragon Slayer", limit=5):
+        """Quickest completions of a quest, measured from session start"""
+        return self.conn.execute(
+            "SELECT s.character_name, s.character_class, q.seconds FROM quest_completions q "
+            "JOIN sessions s ON s.id = q.session_id WHERE q.quest_name = ? ORDER BY q.seconds LIMIT ?",
+            (quest_name, limit)
+        ).fetchall()
+
+    def death_rates(self):
+        """Fraction of fights lost to each enemy type"""
+        return [
+            (enemy_type, fights, deaths / fights if fights else 0.0)
+            for enemy_type, fights, deaths in self.conn.execute(
+                "SELECT enemy_type, fights, deaths FROM enemy_stats ORDER BY enemy_type"
+            )
+        ]
@@ -0,0 +1,176 @@
+from collections.abc import Mapping
+
+# Every item in the game, in registry order. The position is the item's ID
+# and saves refer to items by it, so new items must only ever be appended.
+# 'value' is the shop's base price in gold; 0 means the item can't be traded.
+CATALOG = [
+    {'name': 'Rusty Dagger', 'type': 'weapon', 'damage': 3, 'description': 'A worn dagger', 'value': 10},
+    {'name': 'Health Potion', 'type': 'consumable', 'heal': 30, 'description': 'Restores 30 HP', 'value': 25},
+    {'name': 'Iron Sword', 'type': 'weapon', 'damage': 8, 'description': 'A sturdy iron blade', 'value': 60},
+    {'name': 'Leather Armor', 'type': 'armor', 'defense': 5, 'description': 'Basic leather protection', 'value': 45},
+    {'name': 'Troll Club', 'type': 'weapon', 'damage': 12, 'description': 'A massive wooden club', 'value': 120},
+    {'name': 'Greater Health Potion', 'type': 'consumable', 'heal': 60, 'description': 'Restores 60 HP', 'value': 60},
+    {'name': 'Dragon Scale Armor', 'type': 'armor', 'defense': 15, 'description': 'Armor made from dragon scales', 'value': 400},
+    {'name': 'Flame Sword', 'type': 'weapon', 'damage': 20, 'description': 'A sword imbued with dragon fire', 'value': 500},
+    {'name': 'Lucky Charm', 'type': 'accessory', 'description': 'Increases gold find chance', 'value': 80},
+    {'name': 'Silver Sword', 'type': 'weapon', 'damage': 15, 'description': 'A well-crafted silver blade', 'value': 200},
+    {'name': 'Troll Hide Armor', 'type': 'armor', 'defense': 10, 'description': 'Tough armor made from troll hide', 'value': 180},
+    {'name': 'Merchant Ring', 'type': 'accessory', 'description': 'Improves trading deals', 'value': 150},
+    {'name': 'Dragon Slayer Title', 'type': 'achievement', 'description': 'Proof of your dragon-slaying prowess', 'value': 0},
+    {'name': 'Master Health Potion', 'type': 'consumable', 'heal': 100, 'description': 'Restores 100 HP', 'value': 120},
+    {'name': 'Hero\'s Cape', 'type': 'accessory', 'description': 'Symbol of your heroic status', 'value': 300},
+    {'name': 'Village Map', 'type': 'key_item', 'description': 'Shows hidden paths around the village', 'value': 0},
+    {'name': 'Prophecy Scroll', 'type': 'key_item', 'description': 'Contains ancient wisdom', 'value': 0},
+]
+
+
+class ItemPrototype(Mapping):
+    """Immutable, interned item definition.
+
+    Reads like the item dicts used throughout the game (`item['name']`,
+    `item.get('heal')`), but there is exactly one object per distinct item,
+    so inventories just hold references and equality is an ID comparison.
+    """
+    __slots__ = ('id', '_fields')
+
+    def __init__(self, item_id, fields):
+        object.__setattr__(self, 'id', item_id)
+        object.__setattr__(self, '_fields', dict(fields))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Item prototypes are immutable")
+
+    def __getitem__(self, key):
+        return self._fields[key]
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, ItemPrototype):
+            return self.id == other.id
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self):
+        return self.id
+
+    # Interned and immutable, so copies are the prototype itself
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"<Item {self.id}: {self._fields['name']}>"
+
+
+class ItemInstance(Mapping):
+    """A prototype plus per-instance overrides such as durability"""
+    __slots__ = ('prototype', 'overlay')
+
+    def __init__(self, prototype, overlay=None):
+        self.prototype = prototype
+        self.overlay = dict(overlay or {})
+
+    @property
+    def id(self):
+        return self.prototype.id
+
+    def __getitem__(self, key):
+        if key in self.overlay:
+            return self.overlay[key]
+        return self.prototype[key]
+
+    def __iter__(self):
+        yield from self.prototype
+        for key in self.overlay:
+            if key not in self.prototype:
+                yield key
+
+    def __len__(self):
+        return len(self.prototype) + sum(1 for key in self.overlay if key not in self.prototype)
+
+    def __eq__(self, other):
+        if isinstance(other, ItemInstance):
+            return self.prototype.id == other.prototype.id and self.overlay == other.overlay
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<Item {self.id}: {self['name']} {self.overlay}>"
+
+
+class ItemRegistry:
+    def __init__(self, catalog=()):
+        self.prototypes = []
+        self.by_content = {}
+        self.by_name = {}
+        for fields in catalog:
+            self.intern(fields)
+        # IDs below this are stable across runs and safe to save as bare ints
+        self.stable_count = len(self.prototypes)
+
+    def intern(self, item):
+        """Return the shared prototype for an item dict, registering it if new"""
+        if isinstance(item, (ItemPrototype, ItemInstance)):
+            return item
+
+        key = tuple(sorted(item.items()))
+        prototype = self.by_content.get(key)
+        if prototype is None:
+            prototype = ItemPrototype(len(self.prototypes), item)
+            self.prototypes.append(prototype)
+            self.by_content[key] = prototype
+            self.by_name.setdefault(prototype['name'].lower(), prototype)
+        return prototype
+
+    def get(self, item_id):
+        return self.prototypes[item_id]
+
+    def find(self, name):
+        """Look up a prototype by name, case-insensitively"""
+        return self.by_name.get(name.lower())
+
+    def to_ref(self, item):
+        """Compact save form: a bare ID, or ID plus overlay for instances"""
+        if item is None:
+            return None
+        if isinstance(item, ItemInstance):
+            return {'id': self.to_ref(item.prototype), 'overlay': item.overlay}
+        item = self.intern(item)
+        if item.id < self.stable_count:
+            return item.id
+        # Items created at runtime have no stable ID, so save them in full
+        return dict(item)
+
+    def from_ref(self, ref):
+        """Inverse of to_ref. Also accepts the full item dicts of older saves"""
+        if ref is None:
+            return None
+        if isinstance(ref, int):
+            return self.get(ref)
+        if 'overlay' in ref:
+            return ItemInstance(self.from_ref(ref['id']), ref['overlay'])
+        # Saves from before items had a shop value still match their catalog entry
+        if 'value' not in ref:
+            prototype = self.find(ref.get('name', ''))
+            if prototype is not None and prototype.id < self.stable_count and \
+                    {**ref, 'value': prototype.get('value')} == dict(prototype):
+                return prototype
+        return self.intern(ref)
+
+
+ITEMS = ItemRegistry(CATALOG)
+
+
+def get_item(name):
+    """Catalog item by name; raises KeyError for unknown items"""
+    item = ITEMS.find(name)
+    if item is None:
+        raise KeyError(name)
+    return item
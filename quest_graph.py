@@ -0,0 +1,202 @@
+"""Quest prerequisites compiled into an incremental unlock index.
+
+Each quest declares what it needs before it is offered:
+
+    Quest(..., requires={'quests': ['The Mysterious Village'], 'level': 3,
+                         'max_level': 8, 'items': ['Village Map'],
+                         'flags': ['village_mystery']})
+
+QuestGraph checks the declarations once, orders the quests topologically and
+builds reverse indexes from each fact (a quest completed, an item obtained, a
+story flag set, a level reached) to the quests waiting on it. Every player
+gets a QuestUnlocks that counts each quest's unmet prerequisites; when a fact
+arrives only the quests listed under it are touched, so the cost of an update
+does not depend on the size of the quest catalogue.
+
+Items count once obtained, even if later sold or used. A max_level is the
+only prerequisite that can be lost again.
+"""
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+REQUIREMENT_KINDS = ('quests', 'level', 'max_level', 'items', 'flags')
+
+
+class QuestGraph:
+    def __init__(self, quests):
+        by_name = {}
+        for quest in quests:
+            if quest.name in by_name:
+                raise ValueError(f"Duplicate quest: {quest.name}")
+            unknown = set(quest.requires) - set(REQUIREMENT_KINDS)
+            if unknown:
+                raise ValueError(f"{quest.name}: unknown requirement {', '.join(sorted(unknown))}")
+            by_name[quest.name] = quest
+
+        self.quests = self._topological_order(by_name)
+        self.index = {quest.name: i for i, quest in enumerate(self.quests)}
+
+        # Reverse indexes: fact -> quests it counts towards
+        self.after_quest = {}
+        self.after_item = {}
+        self.after_flag = {}
+        min_levels = []
+        max_levels = []
+        self.requirement_counts = []
+
+        for i, quest in enumerate(self.quests):
+            requires = quest.requires
+            count = 0
+            for kind, successors in (('quests', self.after_quest), ('items', self.after_item),
+                                     ('flags', self.after_flag)):
+                for key in set(requires.get(kind, ())):
+                    successors.setdefault(key, []).append(i)
+                    count += 1
+            if 'level' in requires:
+                min_levels.append((requires['level'], i))
+                count += 1
+            if 'max_level' in requires:
+                max_levels.append((requires['max_level'], i))
+                count += 1
+            self.requirement_counts.append(count)
+
+        min_levels.sort()
+        max_levels.sort()
+        self.min_level_keys = [level for level, _ in min_levels]
+        self.min_level_quests = [i for _, i in min_levels]
+        self.max_level_keys = [level for level, _ in max_levels]
+        self.max_level_quests = [i for _, i in max_levels]
+
+    @staticmethod
+    def _topological_order(by_name):
+        """Quests ordered so that every quest comes after the quests it needs"""
+        waiting = {}
+        successors = {}
+        for name, quest in by_name.items():
+            needs = set(quest.requires.get('quests', ()))
+            for need in needs:
+                if need not in by_name:
+                    raise ValueError(f"{name}: requires unknown quest {need}")
+                successors.setdefault(need, []).append(name)
+            waiting[name] = len(needs)
+
+        ready = deque(name for name in by_name if waiting[name] == 0)
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(by_name[name])
+            for successor in successors.get(name, ()):
+                waiting[successor] -= 1
+                if waiting[successor] == 0:
+                    ready.append(successor)
+
+        if len(order) < len(by_name):
+            stuck = sorted(name for name, count in waiting.items() if count)
+            raise ValueError(f"Quest prerequisites form a cycle: {', '.join(stuck[:5])}")
+        return order
+
+    def unlocks_for(self, player):
+        return QuestUnlocks(self, player)
+
+
+class QuestUnlocks:
+    """One player's unmet-prerequisite counts over a QuestGraph"""
+
+    def __init__(self, graph, player):
+        self.graph = graph
+        self.missing = list(graph.requirement_counts)
+        self.available = set(i for i, count in enumerate(self.missing) if count == 0)
+        self.done = set()
+        self.items = set()
+        self.flags = set()
+        self.shared = False
+
+        # Start below level 1 with every max_level met, then catch up
+        self.level = 0
+        self._satisfy(graph.max_level_quests)
+        self.set_level(player.level)
+        for quest in player.completed_quests:
+            self.quest_completed(quest.name)
+        for item in player.inventory + [player.equipped_weapon, player.equipped_armor]:
+            if item is not None:
+                self.item_obtained(item['name'])
+        for flag in player.story_flags:
+            self.flag_set(flag)
+
+    def fork(self):
+        """Copy that shares this state until either side next changes"""
+        clone = object.__new__(QuestUnlocks)
+        clone.__dict__.update(self.__dict__)
+        clone.shared = self.shared = True
+        return clone
+
+    def _own(self):
+        """Take private copies of state shared by a fork before writing"""
+        self.missing = list(self.missing)
+        self.available = set(self.available)
+        self.done = set(self.done)
+        self.items = set(self.items)
+        self.flags = set(self.flags)
+        self.shared = False
+
+    def _satisfy(self, quests):
+        missing = self.missing
+        for i in quests:
+            missing[i] -= 1
+            if missing[i] == 0 and i not in self.done:
+                self.available.add(i)
+
+    def _unsatisfy(self, quests):
+        missing = self.missing
+        for i in quests:
+            missing[i] += 1
+            self.available.discard(i)
+
+    def quest_completed(self, name):
+        i = self.graph.index.get(name)
+        if i is None or i in self.done:
+            return
+        if self.shared:
+            self._own()
+        self.done.add(i)
+        self.available.discard(i)
+        self._satisfy(self.graph.after_quest.get(name, ()))
+
+    def item_obtained(self, name):
+        if name not in self.items:
+            if self.shared:
+                self._own()
+            self.items.add(name)
+            self._satisfy(self.graph.after_item.get(name, ()))
+
+    def flag_set(self, flag):
+        if flag not in self.flags:
+            if self.shared:
+                self._own()
+            self.flags.add(flag)
+            self._satisfy(self.graph.after_flag.get(flag, ()))
+
+    def set_level(self, level):
+        graph = self.graph
+        if level == self.level:
+            return
+        if self.shared:
+            self._own()
+        low, high = sorted((self.level, level))
+        # Between the two levels: min levels in (low, high] and max levels in [low, high)
+        reached = graph.min_level_quests[bisect_right(graph.min_level_keys, low):
+                                         bisect_right(graph.min_level_keys, high)]
+        outgrown = graph.max_level_quests[bisect_left(graph.max_level_keys, low):
+                                          bisect_left(graph.max_level_keys, high)]
+        if level > self.level:
+            self._satisfy(reached)
+            self._unsatisfy(outgrown)
+        else:
+            self._unsatisfy(reached)
+            self._satisfy(outgrown)
+        self.level = level
+
+    def available_quests(self):
+        """Unlocked, uncompleted quests in topological order"""
+        quests = self.graph.quests
+        return [quests[i] for i in sorted(self.available)]
@@ -1,7 +1,15 @@
+import datetime
+import hashlib
 import random
+from weakref import WeakKeyDictionary
+
+from events import EnemyKilled, GoldGained, ItemAdded, LevelUp, QuestCompleted, WeaponEquipped
+from items import ITEMS, get_item
+from quest_graph import QuestGraph
 
 class Quest:
-    def __init__(self, name, description, quest_type, target=None, target_amount=1, reward_exp=0, reward_gold=0, reward_items=None):
+    def __init__(self, name, description, quest_type, target=None, target_amount=1, reward_exp=0, reward_gold=0, reward_items=None,
+                 requires=None):
         self.name = name
         self.description = description
         self.quest_type = quest_type  # 'kill', 'collect', 'explore', 'story'
@@ -10,8 +18,10 @@ class Quest:
         self.current_progress = 0
         self.reward_exp = reward_exp
         self.reward_gold = reward_gold
-        self.reward_items = reward_items or []
+        self.reward_items = [ITEMS.intern(item) for item in reward_items or []]
         self.completed = False
+        # Prerequisites before the quest is offered; see quest_graph
+        self.requires = requires or {}
         
     def update_progress(self, progress_type, amount=1):
         """Update quest progress based on player actions"""
@@ -26,6 +36,12 @@ class Quest:
             return True
         return False
         
+    def fork(self):
+        """Copy of the progress counters; name, rewards and prerequisites are shared"""
+        clone = object.__new__(Quest)
+        clone.__dict__.update(self.__dict__)
+        return clone
+        
     def display_progress(self):
         status = "✅ Complete" if self.completed else f"📋 Progress: {self.current_progress}/{self.target_amount}"
         print(f"{self.name}: {status}")
@@ -41,163 +57,210 @@ class Quest:
             for item in self.reward_items:
                 rewards.append(item['name'])
         return ", ".join(rewards) if rewards else "None"
+        
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'description': self.description,
+            'quest_type': self.quest_type,
+            'target': self.target,
+            'target_amount': self.target_amount,
+            'current_progress': self.current_progress,
+            'reward_exp': self.reward_exp,
+            'reward_gold': self.reward_gold,
+            'reward_items': [ITEMS.to_ref(item) for item in self.reward_items],
+            'completed': self.completed
+        }
+        
+    @classmethod
+    def from_dict(cls, data):
+        quest = cls(
+            name=data['name'],
+            description=data['description'],
+            quest_type=data['quest_type'],
+            target=data['target'],
+            target_amount=data['target_amount'],
+            reward_exp=data['reward_exp'],
+            reward_gold=data['reward_gold'],
+            reward_items=[ITEMS.from_ref(ref) for ref in data['reward_items']]
+        )
+        quest.current_progress = data['current_progress']
+        quest.completed = data['completed']
+        return quest
+
+# Every quest in the game. reward_items are item names; see quest_graph for requires
+QUEST_CATALOG = [
+    # Starter quests
+    {
+        'name': "First Blood",
+        'description': "Defeat 3 Goblins to prove your combat skills",
+        'quest_type': "kill_goblin",
+        'target': "goblin",
+        'target_amount': 3,
+        'reward_exp': 75,
+        'reward_gold': 50,
+        'reward_items': ['Health Potion'],
+        'requires': {'max_level': 3}
+    },
+    {
+        'name': "Treasure Hunter",
+        'description': "Collect 100 gold pieces",
+        'quest_type': "collect_gold",
+        'target': "gold",
+        'target_amount': 100,
+        'reward_exp': 50,
+        'reward_gold': 25,
+        'reward_items': ['Lucky Charm'],
+        'requires': {'max_level': 3}
+    },
+    {
+        'name': "Equipment Upgrade",
+        'description': "Find and equip a weapon",
+        'quest_type': "equip_weapon",
+        'target': "weapon",
+        'target_amount': 1,
+        'reward_exp': 40,
+        'reward_gold': 30,
+        'requires': {'max_level': 3}
+    },
+    
+    # Intermediate quests
+    {
+        'name': "Orc Slayer",
+        'description': "Eliminate 5 Orc Warriors threatening the village",
+        'quest_type': "kill_orc",
+        'target': "orc",
+        'target_amount': 5,
+        'reward_exp': 200,
+        'reward_gold': 150,
+        'reward_items': ['Silver Sword'],
+        'requires': {'level': 3}
+    },
+    {
+        'name': "Cave Explorer",
+        'description': "Defeat the Cave Troll in its lair",
+        'quest_type': "kill_troll",
+        'target': "troll",
+        'target_amount': 1,
+        'reward_exp': 300,
+        'reward_gold': 200,
+        'reward_items': ['Troll Hide Armor'],
+        'requires': {'level': 3}
+    },
+    {
+        'name': "Merchant's Request",
+        'description': "Collect rare items and sell them for 500 gold total",
+        'quest_type': "collect_gold",
+        'target': "gold",
+        'target_amount': 500,
+        'reward_exp': 150,
+        'reward_gold': 100,
+        'reward_items': ['Merchant Ring'],
+        'requires': {'level': 3}
+    },
+    
+    # Advanced quests
+    {
+        'name': "Dragon Slayer",
+        'description': "Face the Young Dragon and emerge victorious",
+        'quest_type': "kill_dragon",
+        'target': "dragon",
+        'target_amount': 1,
+        'reward_exp': 1000,
+        'reward_gold': 500,
+        'reward_items': ['Dragon Slayer Title', 'Master Health Potion'],
+        'requires': {'level': 6}
+    },
+    {
+        'name': "Hero's Journey",
+        'description': "Reach level 10 to become a true hero",
+        'quest_type': "reach_level",
+        'target': "level",
+        'target_amount': 10,
+        'reward_exp': 500,
+        'reward_gold': 300,
+        'reward_items': ["Hero's Cape"],
+        'requires': {'level': 6}
+    },
+    
+    # Story quests
+    {
+        'name': "The Mysterious Village",
+        'description': "Investigate reports of strange happenings in the nearby village",
+        'quest_type': "story",
+        'target': "village_mystery",
+        'target_amount': 1,
+        'reward_exp': 100,
+        'reward_gold': 75,
+        'reward_items': ['Village Map']
+    },
+    {
+        'name': "The Ancient Prophecy",
+        'description': "Discover the truth behind the ancient prophecy",
+        'quest_type': "story",
+        'target': "prophecy",
+        'target_amount': 1,
+        'reward_exp': 200,
+        'reward_gold': 150,
+        'reward_items': ['Prophecy Scroll'],
+        'requires': {'quests': ['The Mysterious Village'], 'items': ['Village Map']}
+    },
+]
+
+
+def quest_from_spec(spec):
+    """Build a quest definition from a QUEST_CATALOG entry"""
+    fields = dict(spec)
+    fields['reward_items'] = [get_item(name) for name in spec.get('reward_items', ())]
+    return Quest(**fields)
 
 class QuestManager:
-    def __init__(self):
-        self.available_quests = []
+    # Quest definitions compiled once per process and shared by every manager;
+    # content_pack.use_content_pack swaps in a packed graph
+    catalog_graph = None
+    
+    def __init__(self, daily_rotation=None):
         self.story_progress = 0
+        self.daily_rotation = daily_rotation or DAILY_ROTATION
+        # Each player's unlock state, built on first use
+        self.unlocks = WeakKeyDictionary()
         self.init_quests()
         
     def init_quests(self):
-        """Initialize all available quests"""
-        
-        # Starter quests
-        starter_quests = [
-            Quest(
-                name="First Blood",
-                description="Defeat 3 Goblins to prove your combat skills",
-                quest_type="kill_goblin",
-                target="goblin",
-                target_amount=3,
-                reward_exp=75,
-                reward_gold=50,
-                reward_items=[{'name': 'Health Potion', 'type': 'consumable', 'heal': 30, 'description': 'Restores 30 HP'}]
-            ),
-            Quest(
-                name="Treasure Hunter",
-                description="Collect 100 gold pieces",
-                quest_type="collect_gold",
-                target="gold",
-                target_amount=100,
-                reward_exp=50,
-                reward_gold=25,
-                reward_items=[{'name': 'Lucky Charm', 'type': 'accessory', 'description': 'Increases gold find chance'}]
-            ),
-            Quest(
-                name="Equipment Upgrade",
-                description="Find and equip a weapon",
-                quest_type="equip_weapon",
-                target="weapon",
-                target_amount=1,
-                reward_exp=40,
-                reward_gold=30
-            )
-        ]
-        
-        # Intermediate quests
-        intermediate_quests = [
-            Quest(
-                name="Orc Slayer",
-                description="Eliminate 5 Orc Warriors threatening the village",
-                quest_type="kill_orc",
-                target="orc",
-                target_amount=5,
-                reward_exp=200,
-                reward_gold=150,
-                reward_items=[{'name': 'Silver Sword', 'type': 'weapon', 'damage': 15, 'description': 'A well-crafted silver blade'}]
-            ),
-            Quest(
-                name="Cave Explorer",
-                description="Defeat the Cave Troll in its lair",
-                quest_type="kill_troll",
-                target="troll",
-                target_amount=1,
-                reward_exp=300,
-                reward_gold=200,
-                reward_items=[{'name': 'Troll Hide Armor', 'type': 'armor', 'defense': 10, 'description': 'Tough armor made from troll hide'}]
-            ),
-            Quest(
-                name="Merchant's Request",
-                description="Collect rare items and sell them for 500 gold total",
-                quest_type="collect_gold",
-                target="gold",
-                target_amount=500,
-                reward_exp=150,
-                reward_gold=100,
-                reward_items=[{'name': 'Merchant Ring', 'type': 'accessory', 'description': 'Improves trading deals'}]
-            )
-        ]
-        
-        # Advanced quests
-        advanced_quests = [
-            Quest(
-                name="Dragon Slayer",
-                description="Face the Young Dragon and emerge victorious",
-                quest_type="kill_dragon",
-                target="dragon",
-                target_amount=1,
-                reward_exp=1000,
-                reward_gold=500,
-                reward_items=[
-                    {'name': 'Dragon Slayer Title', 'type': 'achievement', 'description': 'Proof of your dragon-slaying prowess'},
-                    {'name': 'Master Health Potion', 'type': 'consumable', 'heal': 100, 'description': 'Restores 100 HP'}
-                ]
-            ),
-            Quest(
-                name="Hero's Journey",
-                description="Reach level 10 to become a true hero",
-                quest_type="reach_level",
-                target="level",
-                target_amount=10,
-                reward_exp=500,
-                reward_gold=300,
-                reward_items=[{'name': 'Hero\'s Cape', 'type': 'accessory', 'description': 'Symbol of your heroic status'}]
-            )
-        ]
-        
-        # Story quests
-        story_quests = [
-            Quest(
-                name="The Mysterious Village",
-                description="Investigate reports of strange happenings in the nearby village",
-                quest_type="story",
-                target="village_mystery",
-                target_amount=1,
-                reward_exp=100,
-                reward_gold=75,
-                reward_items=[{'name': 'Village Map', 'type': 'key_item', 'description': 'Shows hidden paths around the village'}]
-            ),
-            Quest(
-                name="The Ancient Prophecy",
-                description="Discover the truth behind the ancient prophecy",
-                quest_type="story",
-                target="prophecy",
-                target_amount=1,
-                reward_exp=200,
-                reward_gold=150,
-                reward_items=[{'name': 'Prophecy Scroll', 'type': 'key_item', 'description': 'Contains ancient wisdom'}]
-            )
-        ]
-        
-        self.all_quests = {
-            'starter': starter_quests,
-            'intermediate': intermediate_quests,
-            'advanced': advanced_quests,
-            'story': story_quests
-        }
+        """Share the process-wide compiled quest catalog"""
+        if QuestManager.catalog_graph is None:
+            QuestManager.catalog_graph = QuestGraph([quest_from_spec(spec) for spec in QUEST_CATALOG])
+        self.graph = QuestManager.catalog_graph
+    
+    def unlocks_for(self, player):
+        """The player's unlock state, built from their progress on first use"""
+        unlocks = self.unlocks.get(player)
+        if unlocks is None:
+            unlocks = self.unlocks[player] = self.graph.unlocks_for(player)
+        return unlocks
+    
+    def fork(self, player=None, clone=None):
+        """Manager for a forked game, sharing every quest definition.
         
-        # Start with starter quests
-        self.available_quests = starter_quests.copy()
+        Pass the original player and its fork to carry over that player's
+        unlock state; it is copied on first write.
+        """
+        fork = object.__new__(QuestManager)
+        fork.__dict__.update(self.__dict__)
+        fork.unlocks = WeakKeyDictionary()
+        if player is not None and player in self.unlocks:
+            fork.unlocks[clone] = self.unlocks[player].fork()
+        return fork
     
-    def get_available_quests(self, player_level):
-        """Get quests appropriate for player level"""
-        available = []
+    def get_available_quests(self, player):
+        """Quests whose prerequisites the player meets"""
+        available = self.unlocks_for(player).available_quests()
         
-        # Always show starter quests for low level players
-        if player_level <= 3:
-            available.extend([q for q in self.all_quests['starter'] if not q.completed])
-            
-        # Add intermediate quests for mid-level players
-        if player_level >= 3:
-            available.extend([q for q in self.all_quests['intermediate'] if not q.completed])
-            
-        # Add advanced quests for high-level players
-        if player_level >= 6:
-            available.extend([q for q in self.all_quests['advanced'] if not q.completed])
-            
-        # Story quests based on story progress
-        if self.story_progress >= 0:
-            available.extend([q for q in self.all_quests['story'] if not q.completed])
+        # Today's daily quests, shared with every other player, until taken
+        available.extend(
+            quest for quest in self.daily_rotation.quests_for(player.level)
+            if not self.daily_rotation.taken(player, quest)
+        )
             
         return available
     
@@ -210,8 +273,8 @@ class QuestManager:
                 continue
                 
             # Handle different quest types
-            if quest.quest_type == f"kill_{target}" and action_type == "kill":
-                if quest.update_progress("kill", amount):
+            if quest.quest_type in (f"kill_{target}", "kill_any") and action_type == "kill":
+                if quest.update_progress(quest.quest_type, amount):
                     completed_quests.append(quest)
                     
             elif quest.quest_type == "collect_gold" and action_type == "gold_gained":
@@ -227,6 +290,10 @@ class QuestManager:
                 if quest.current_progress >= quest.target_amount:
                     quest.completed = True
                     completed_quests.append(quest)
+                    
+            elif quest.quest_type == "story" and action_type == "explore":
+                if quest.update_progress("story", amount):
+                    completed_quests.append(quest)
         
         # Award rewards for completed quests
         for quest in completed_quests:
@@ -234,6 +301,44 @@ class QuestManager:
             
         return completed_quests
     
+    def attach(self, bus):
+        """Track quest progress from game events"""
+        bus.subscribe(EnemyKilled, lambda event: self.update_quest_progress(event.player, "kill", event.enemy_type))
+        bus.subscribe(GoldGained, self.on_gold_gained)
+        bus.subscribe(WeaponEquipped, lambda event: self.update_quest_progress(event.player, "weapon_equipped"))
+        bus.subscribe(LevelUp, lambda event: self.update_quest_progress(event.player, "level_up"))
+        
+        # Keep unlock states current as prerequisites are met
+        bus.subscribe(QuestCompleted, self.on_unlock_event)
+        bus.subscribe(LevelUp, self.on_unlock_event)
+        bus.subscribe(ItemAdded, self.on_unlock_event)
+    
+    def on_gold_gained(self, event):
+        # Quest rewards don't count towards gold-collecting quests
+        if event.source != 'quest':
+            self.update_quest_progress(event.player, "gold_gained", None, event.amount)
+        # Story quests advance by exploring
+        if event.source == 'explore':
+            self.update_quest_progress(event.player, "explore")
+    
+    def on_unlock_event(self, event):
+        unlocks = self.unlocks.get(event.player)
+        if unlocks is None:
+            return
+        if isinstance(event, QuestCompleted):
+            unlocks.quest_completed(event.quest.name)
+        elif isinstance(event, LevelUp):
+            unlocks.set_level(event.level)
+        else:
+            unlocks.item_obtained(event.item['name'])
+    
+    def set_story_flag(self, player, flag):
+        if flag not in player.story_flags:
+            player.story_flags.append(flag)
+            unlocks = self.unlocks.get(player)
+            if unlocks is not None:
+                unlocks.flag_set(flag)
+    
     def complete_quest(self, player, quest):
         """Complete a quest and give rewards"""
         print(f"\n🎊 Quest Complete: {quest.name}!")
@@ -247,6 +352,7 @@ class QuestManager:
         if quest.reward_gold > 0:
             player.gold += quest.reward_gold
             print(f"💰 Gained {quest.reward_gold} gold!")
+            player.bus.defer(GoldGained(player, quest.reward_gold, 'quest'))
             
         for item in quest.reward_items:
             player.add_item(item)
@@ -260,24 +366,37 @@ class QuestManager:
         # Update story progress for story quests
         if quest.quest_type == "story":
             self.story_progress += 1
+            self.set_story_flag(player, quest.target)
+        
+        player.bus.defer(QuestCompleted(player, quest))
     
     def assign_quest(self, player, quest_index):
         """Assign a quest to the player"""
-        available = self.get_available_quests(player.level)
+        available = self.get_available_quests(player)
         
         if 0 <= quest_index < len(available):
             quest = available[quest_index]
-            if quest not in player.quests:
-                player.quests.append(quest)
-                print(f"📋 Quest accepted: {quest.name}")
-                print(f"📝 {quest.description}")
-                print(f"🎁 Reward: {quest.get_reward_text()}")
-                return True
+            # An expired daily makes way for today's quest of the same name
+            if any(active.name == quest.name and not getattr(active, 'expired', False) for active in player.quests):
+                return False
+            if self.daily_rotation.is_daily(quest):
+                quest = self.daily_rotation.accept(player, quest)
+                if quest is None:
+                    return False
+                player.quests = [active for active in player.quests if active.name != quest.name]
+            else:
+                # The catalog keeps pristine definitions; the player gets the progress
+                quest = quest.fork()
+            player.quests.append(quest)
+            print(f"📋 Quest accepted: {quest.name}")
+            print(f"📝 {quest.description}")
+            print(f"🎁 Reward: {quest.get_reward_text()}")
+            return True
         return False
     
-    def display_available_quests(self, player_level):
+    def display_available_quests(self, player):
         """Display all available quests"""
-        available = self.get_available_quests(player_level)
+        available = self.get_available_quests(player)
         
         if not available:
             print("No quests available at your current level.")
@@ -311,30 +430,35 @@ class QuestManager:
             print(f"✅ {quest.name}")
 
 # Random quest generator for additional content
+DAILY_QUEST_TEMPLATES = [
+    {
+        'name': 'Daily Hunt',
+        'description': 'Defeat {amount} enemies',
+        'type': 'kill_any',
+        'amounts': [3, 5, 7],
+        'rewards': {'exp': [30, 50, 80], 'gold': [20, 35, 60]}
+    },
+    {
+        'name': 'Gold Rush',
+        'description': 'Collect {amount} gold',
+        'type': 'collect_gold',
+        'amounts': [50, 100, 200],
+        'rewards': {'exp': [25, 40, 70], 'gold': [10, 20, 40]}
+    }
+]
+
+def daily_tier(player_level):
+    return min(player_level // 3, 2)  # 0, 1, or 2
+
 class RandomQuestGenerator:
     @staticmethod
     def generate_daily_quest(player_level):
         """Generate a random daily quest"""
-        quest_templates = [
-            {
-                'name': 'Daily Hunt',
-                'description': 'Defeat {amount} enemies',
-                'type': 'kill_any',
-                'amounts': [3, 5, 7],
-                'rewards': {'exp': [30, 50, 80], 'gold': [20, 35, 60]}
-            },
-            {
-                'name': 'Gold Rush',
-                'description': 'Collect {amount} gold',
-                'type': 'collect_gold',
-                'amounts': [50, 100, 200],
-                'rewards': {'exp': [25, 40, 70], 'gold': [10, 20, 40]}
-            }
-        ]
-        
-        template = random.choice(quest_templates)
-        difficulty_index = min(player_level // 3, 2)  # 0, 1, or 2
-        
+        template = random.choice(DAILY_QUEST_TEMPLATES)
+        return RandomQuestGenerator.build_daily_quest(template, daily_tier(player_level))
+    
+    @staticmethod
+    def build_daily_quest(template, difficulty_index):
         amount = template['amounts'][difficulty_index]
         exp_reward = template['rewards']['exp'][difficulty_index]
         gold_reward = template['rewards']['gold'][difficulty_index]
@@ -347,3 +471,152 @@ class RandomQuestGenerator:
             reward_exp=exp_reward,
             reward_gold=gold_reward
         )
+
+class DailyProgress:
+    """One player's progress on a shared daily quest definition.
+    
+    Reads like a Quest (name, rewards, display) by delegating to the
+    definition, but only stores the per-player counters. Records from an
+    earlier day are expired and stop progressing.
+    """
+    __slots__ = ('definition', 'rotation', 'day', 'tier', 'current_progress', 'completed')
+    
+    def __init__(self, definition, rotation, day, tier):
+        self.definition = definition
+        self.rotation = rotation
+        self.day = day
+        self.tier = tier
+        self.current_progress = 0
+        self.completed = False
+        
+    def __getattr__(self, name):
+        # Not set yet while copy or pickle rebuilds the record
+        if name == 'definition':
+            raise AttributeError(name)
+        return getattr(self.definition, name)
+    
+    @property
+    def expired(self):
+        return self.day != self.rotation.day
+    
+    def fork(self):
+        clone = DailyProgress(self.definition, self.rotation, self.day, self.tier)
+        clone.current_progress = self.current_progress
+        clone.completed = self.completed
+        return clone
+    
+    def update_progress(self, progress_type, amount=1):
+        if self.expired:
+            return False
+        return Quest.update_progress(self, progress_type, amount)
+    
+    def display_progress(self):
+        if self.expired and not self.completed:
+            print(f"{self.name}: ⌛ Expired")
+            print(f"   {self.description}")
+        else:
+            Quest.display_progress(self)
+    
+    def to_dict(self):
+        data = self.definition.to_dict()
+        data['current_progress'] = self.current_progress
+        data['completed'] = self.completed
+        # Which day's daily this was, so a reload can't take it again
+        data['daily'] = {'day': self.day.isoformat(), 'tier': self.tier}
+        return data
+
+class DailyQuestRotation:
+    """Deterministic daily quests shared by every player.
+    
+    Each day's quests for a difficulty tier are picked by a hash of
+    (date, tier), so every player and every process sees the same dailies.
+    Definitions are built once per day and cached; players only get small
+    DailyProgress records, kept with their other quests. On the first call
+    after midnight the cache is dropped and older records expire.
+    """
+    
+    def __init__(self, quests_per_day=1, seed='dailies', clock=datetime.date.today):
+        self.quests_per_day = quests_per_day
+        self.seed = seed
+        self.clock = clock
+        self.day = None
+        self.definitions = {}
+        
+    def refresh(self):
+        """Roll over to a new day if the date has changed"""
+        today = self.clock()
+        if today != self.day:
+            self.day = today
+            self.definitions = {}
+        return today
+        
+    def quests_for(self, player_level):
+        """Today's shared quest definitions for a player's tier"""
+        self.refresh()
+        return self.quests_for_tier(daily_tier(player_level))
+        
+    def quests_for_tier(self, tier):
+        quests = self.definitions.get(tier)
+        if quests is None:
+            quests = self.definitions[tier] = self._build(tier)
+        return quests
+        
+    def _build(self, tier):
+        digest = hashlib.sha256(f"{self.seed}:{self.day.isoformat()}:{tier}".encode()).digest()
+        rng = random.Random(int.from_bytes(digest[:8], 'big'))
+        count = min(self.quests_per_day, len(DAILY_QUEST_TEMPLATES))
+        templates = rng.sample(DAILY_QUEST_TEMPLATES, count)
+        return [RandomQuestGenerator.build_daily_quest(template, tier) for template in templates]
+        
+    def tier_of(self, quest):
+        """Tier of one of today's definitions, or None for any other quest"""
+        for tier, quests in self.definitions.items():
+            if any(quest is daily for daily in quests):
+                return tier
+        return None
+        
+    def is_daily(self, quest):
+        return self.tier_of(quest) is not None
+        
+    def accept(self, player, definition):
+        """Progress record for a player taking today's quest, or None if already taken.
+        
+        Whether it was taken is read from the player's own quests, so forks
+        and reloaded saves each answer for themselves.
+        """
+        self.refresh()
+        if self.taken(player, definition):
+            return None
+        return DailyProgress(definition, self, self.day, self.tier_of(definition))
+    
+    def taken(self, player, definition):
+        """Whether the player has already accepted today's definition"""
+        key = (self.day, self.tier_of(definition), definition.name)
+        return any(
+            isinstance(quest, DailyProgress) and (quest.day, quest.tier, quest.name) == key
+            for quest in player.quests + player.completed_quests
+        )
+    
+    def restore(self, data):
+        """DailyProgress for a saved daily; definitions from other days are rebuilt from the save"""
+        self.refresh()
+        day = datetime.date.fromisoformat(data['daily']['day'])
+        tier = data['daily']['tier']
+        definition = None
+        if day == self.day:
+            definition = next((quest for quest in self.quests_for_tier(tier) if quest.name == data['name']), None)
+        if definition is None:
+            definition = Quest.from_dict(dict(data, current_progress=0, completed=False))
+        record = DailyProgress(definition, self, day, tier)
+        record.current_progress = data['current_progress']
+        record.completed = data['completed']
+        return record
+
+# Shared by every QuestManager in the process
+DAILY_ROTATION = DailyQuestRotation()
+
+def quest_from_dict(data):
+    """Saved quest; dailies come back as progress on the shared rotation"""
+    if 'daily' in data:
+        return DAILY_ROTATION.restore(data)
+    return Quest.from_dict(data)
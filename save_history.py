@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from character import Character
+
+# Which parts of a save go into which block. Anything not listed is a stat.
+BLOCK_FIELDS = {
+    'inventory': ('inventory',),
+    'quests': ('quests', 'completed_quests'),
+    'equipment': ('equipped_weapon', 'equipped_armor'),
+}
+
+
+class SaveHistory:
+    """Content-addressed history of every save and autosave, for every character.
+
+    Each save is split into blocks (stats, inventory, quests, equipment).
+    A block is stored once, compressed, under the SHA-256 of its canonical
+    JSON, so identical blocks are shared across snapshots and characters and
+    disk use grows with unique content. A snapshot is just a line in the
+    character's manifest naming its blocks.
+    """
+
+    def __init__(self, root='saves/history'):
+        self.root = root
+        self.blocks_dir = os.path.join(root, 'blocks')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        self.known_blocks = set()
+        # Manual saves come from the game thread, autosaves from the writer thread
+        self.lock = threading.Lock()
+
+    def _block_path(self, digest):
+        return os.path.join(self.blocks_dir, digest[:2], digest[2:])
+
+    def _manifest_path(self, character_name):
+        return os.path.join(self.manifests_dir, f'{character_name}.jsonl')
+
+    def _put_block(self, data):
+        payload = json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(payload).hexdigest()
+        if digest in self.known_blocks:
+            return digest
+
+        path = self._block_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(zlib.compress(payload, 9))
+            os.replace(temp_path, path)
+        self.known_blocks.add(digest)
+        return digest
+
+    def _get_block(self, digest):
+        with open(self._block_path(digest), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()).decode('utf-8'))
+
+    def record(self, player, kind='save'):
+        """Store a snapshot of the player's current state"""
+        return self.record_data(player.to_dict(), kind)
+
+    def record_data(self, data, kind='save'):
+        """Store a snapshot already taken with Character.to_dict"""
+        data = dict(data)
+        with self.lock:
+            blocks = {}
+            for block, fields in BLOCK_FIELDS.items():
+                blocks[block] = self._put_block({field: data.pop(field) for field in fields})
+            blocks['stats'] = self._put_block(data)
+
+            entry = {'time': time.time(), 'level': data['level'], 'kind': kind, 'blocks': blocks}
+            os.makedirs(self.manifests_dir, exist_ok=True)
+            with open(self._manifest_path(data['name']), 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        return entry
+
+    def characters(self):
+        if not os.path.exists(self.manifests_dir):
+            return []
+        return sorted(name[:-len('.jsonl')] for name in os.listdir(self.manifests_dir) if name.endswith('.jsonl'))
+
+    def snapshots(self, character_name):
+        """Manifest entries for a character, oldest first"""
+        path = self._manifest_path(character_name)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def restore(self, character_name, index=-1):
+        """Rebuild the character as it was at one of its snapshots"""
+        entry = self.snapshots(character_name)[index]
+        data = {}
+        for digest in entry['blocks'].values():
+            data.update(self._get_block(digest))
+        return Character.from_dict(data)
+
+    def disk_usage(self):
+        """Bytes used by blocks and manifests"""
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return total
@@ -0,0 +1,271 @@
+"""Auto-tuner for enemy scaling.
+
+Fits per-enemy health, attack and defense curves (base + (level - 1) * growth) so that
+headless fights hit target win rates and fight lengths for each class, then
+writes a scaling table that CombatSystem.create_enemy loads.
+
+Usage: python tuner.py [--targets targets.json] [--out scaling.json]
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from character import Character
+from combat import CombatSystem, DEFAULT_SCALING, SCALING_FILE
+
+TUNED_STATS = ('health', 'attack', 'defense')
+# Weight of the lost-fight shaping term in the objective
+LOSS_SHAPING = 0.01
+# Bump when the objective changes so cached losses from older runs are ignored
+OBJECTIVE_VERSION = 2
+
+# (enemy_type, class) -> per-level target curves
+DEFAULT_TARGETS = {
+    ('goblin', 'warrior'): {'levels': [1, 3, 5], 'win_rate': [0.95, 0.95, 0.95], 'rounds': [3, 3, 3]},
+    ('goblin', 'mage'): {'levels': [1, 3, 5], 'win_rate': [0.90, 0.92, 0.95], 'rounds': [3, 3, 3]},
+    ('goblin', 'rogue'): {'levels': [1, 3, 5], 'win_rate': [0.92, 0.94, 0.95], 'rounds': [3, 3, 3]},
+    ('orc', 'warrior'): {'levels': [2, 4, 6], 'win_rate': [0.85, 0.85, 0.85], 'rounds': [5, 5, 5]},
+    ('orc', 'mage'): {'levels': [2, 4, 6], 'win_rate': [0.75, 0.80, 0.80], 'rounds': [5, 5, 5]},
+    ('orc', 'rogue'): {'levels': [2, 4, 6], 'win_rate': [0.80, 0.82, 0.82], 'rounds': [5, 5, 5]},
+    ('troll', 'warrior'): {'levels': [4, 6, 8], 'win_rate': [0.70, 0.75, 0.75], 'rounds': [7, 7, 7]},
+    ('troll', 'mage'): {'levels': [4, 6, 8], 'win_rate': [0.60, 0.65, 0.70], 'rounds': [7, 7, 7]},
+    ('troll', 'rogue'): {'levels': [4, 6, 8], 'win_rate': [0.65, 0.70, 0.72], 'rounds': [7, 7, 7]},
+    ('dragon', 'warrior'): {'levels': [6, 8, 10], 'win_rate': [0.40, 0.50, 0.60], 'rounds': [10, 10, 10]},
+    ('dragon', 'mage'): {'levels': [6, 8, 10], 'win_rate': [0.35, 0.45, 0.55], 'rounds': [10, 10, 10]},
+    ('dragon', 'rogue'): {'levels': [6, 8, 10], 'win_rate': [0.38, 0.48, 0.58], 'rounds': [10, 10, 10]},
+}
+
+
+def make_player(character_class, level):
+    """Fresh character levelled up without equipment"""
+    player = Character('Tuner', character_class)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(level - 1):
+            player.level_up()
+    return player
+
+
+def greedy_action(player, enemy):
+    """Cheap baseline policy: use whichever of attack or magic hits harder"""
+    attack = player.get_attack_power() - enemy.defense
+    magic = player.magic + 2.5 - enemy.defense if player.magic >= 5 else 0
+    return ("magic" if magic > attack else "attack"), None
+
+
+def params_to_curves(params):
+    """Flat parameter vector -> {stat: [base, growth]} for one enemy type"""
+    return {
+        stat: [round(params[2 * i], 4), round(params[2 * i + 1], 4)]
+        for i, stat in enumerate(TUNED_STATS)
+    }
+
+
+def params_key(params, context=''):
+    payload = json.dumps([context, [round(p, 4) for p in params]])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def simulate_point(enemy_type, character_class, level, fights):
+    """(win_rate, average_rounds, damage_share) at one target point.
+
+    damage_share is the average fraction of the enemy's health removed in the
+    fights that were lost, or 1.0 if none were.
+    """
+    template = make_player(character_class, level)
+    wins = 0
+    total_rounds = 0
+    lost_damage = 0.0
+    for _ in range(fights):
+        player = template.fork()
+        enemy = CombatSystem.create_enemy(enemy_type, level)
+        outcome, rounds = CombatSystem.simulate_fight(player, enemy, greedy_action)
+        if outcome == 'won':
+            wins += 1
+        else:
+            lost_damage += 1 - enemy.current_health / enemy.max_health
+        total_rounds += rounds
+    losses = fights - wins
+    return wins / fights, total_rounds / fights, lost_damage / losses if losses else 1.0
+
+
+def evaluate(enemy_type, params, curves, fights, seed):
+    """Squared error between simulated and target curves for one candidate.
+
+    curves maps character class -> target curve for this enemy type.
+    """
+    CombatSystem.scaling_table = {enemy_type: params_to_curves(params)}
+    # Common random numbers: every candidate sees the same dice
+    random.seed(seed)
+
+    loss = 0.0
+    for character_class, curve in sorted(curves.items()):
+        for level, target_win, target_rounds in zip(curve['levels'], curve['win_rate'], curve['rounds']):
+            win_rate, average_rounds, damage_share = simulate_point(enemy_type, character_class, level, fights)
+            loss += (win_rate - target_win) ** 2
+            loss += 0.1 * ((average_rounds - target_rounds) / target_rounds) ** 2
+            if win_rate < target_win:
+                # Kept apart from the win rate: a small pull towards hurting the
+                # enemy more, so the loss isn't flat while every candidate loses
+                loss += LOSS_SHAPING * (1 - damage_share)
+    return loss
+
+
+def report(table, curves, fights, seed):
+    """Print the real win rates and fight lengths a scaling table produces"""
+    print(f"{'Enemy':<8}{'Class':<9}{'Level':>6}{'Win rate':>10}{'Target':>8}{'Rounds':>8}{'Target':>8}")
+    for enemy_type in sorted(curves):
+        CombatSystem.scaling_table = {enemy_type: table[enemy_type]}
+        random.seed(seed)
+        for character_class, curve in sorted(curves[enemy_type].items()):
+            for level, target_win, target_rounds in zip(curve['levels'], curve['win_rate'], curve['rounds']):
+                win_rate, average_rounds, _ = simulate_point(enemy_type, character_class, level, fights)
+                print(f"{enemy_type:<8}{character_class:<9}{level:>6}{win_rate:>10.0%}{target_win:>8.0%}"
+                      f"{average_rounds:>8.1f}{target_rounds:>8}")
+
+
+class ScalingTuner:
+    """Diagonal cross-entropy search over scaling parameters.
+
+    Every enemy type only affects its own targets, so each gets an independent
+    search over its (base, growth) pairs. Each generation samples `population`
+    candidates per enemy around the current mean, evaluates all of them across
+    a process pool and refits the mean and per-parameter spread to the best
+    quarter. Results are cached by parameter hash, so re-sampled candidates and
+    repeated runs with a cache file are free.
+    """
+
+    def __init__(self, targets=None, fights=100, population=16, workers=None, seed=0, cache_file=None):
+        targets = targets or DEFAULT_TARGETS
+        self.curves = {}
+        for (enemy_type, character_class), curve in targets.items():
+            self.curves.setdefault(enemy_type, {})[character_class] = curve
+        self.fights = fights
+        self.population = population
+        self.workers = workers or os.cpu_count()
+        self.seed = seed
+        self.cache_file = cache_file
+        self.cache = {}
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, 'r') as f:
+                self.cache = json.load(f)
+
+    def context(self, enemy_type):
+        # Cached losses are only comparable under the same targets and dice
+        return json.dumps([OBJECTIVE_VERSION, enemy_type, sorted(self.curves[enemy_type].items()), self.fights,
+                           self.seed])
+
+    def initial_params(self, enemy_type):
+        """Start from the currently loaded scaling table"""
+        table = CombatSystem.load_scaling_table()
+        params = []
+        for stat in TUNED_STATS:
+            base, growth = table.get(enemy_type, {}).get(stat, DEFAULT_SCALING)
+            params.extend([base, growth])
+        return params
+
+    def evaluate_all(self, pool, candidates):
+        """Losses for {enemy_type: [params, ...]}, computing only cache misses"""
+        keys = {
+            enemy_type: [params_key(params, self.context(enemy_type)) for params in batch]
+            for enemy_type, batch in candidates.items()
+        }
+        futures = {}
+        for enemy_type, batch in candidates.items():
+            for key, params in zip(keys[enemy_type], batch):
+                if key not in self.cache and key not in futures:
+                    futures[key] = pool.submit(
+                        evaluate, enemy_type, params, self.curves[enemy_type], self.fights, self.seed
+                    )
+        for key, future in futures.items():
+            self.cache[key] = future.result()
+
+        return {enemy_type: [self.cache[key] for key in batch_keys] for enemy_type, batch_keys in keys.items()}
+
+    def tune(self, generations=20, verbose=True):
+        """Run the search and return the best scaling table found"""
+        rng = random.Random(self.seed)
+        enemy_types = sorted(self.curves)
+        means = {enemy_type: self.initial_params(enemy_type) for enemy_type in enemy_types}
+        spreads = {enemy_type: [0.25 * abs(v) + 0.05 for v in mean] for enemy_type, mean in means.items()}
+        best = {enemy_type: (math.inf, list(mean)) for enemy_type, mean in means.items()}
+        elite_count = max(2, self.population // 4)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for generation in range(generations):
+                candidates = {
+                    enemy_type: [list(mean)] + [
+                        [max(0.05, rng.gauss(m, s)) for m, s in zip(mean, spreads[enemy_type])]
+                        for _ in range(self.population - 1)
+                    ]
+                    for enemy_type, mean in means.items()
+                }
+                losses = self.evaluate_all(pool, candidates)
+
+                for enemy_type, batch in candidates.items():
+                    ranked = sorted(zip(losses[enemy_type], range(len(batch))))
+                    if ranked[0][0] < best[enemy_type][0]:
+                        best[enemy_type] = (ranked[0][0], batch[ranked[0][1]])
+
+                    mean, spread = means[enemy_type], spreads[enemy_type]
+                    elites = [batch[i] for _, i in ranked[:elite_count]]
+                    for d in range(len(mean)):
+                        values = [elite[d] for elite in elites]
+                        new_mean = sum(values) / len(values)
+                        variance = sum((v - new_mean) ** 2 for v in values) / len(values)
+                        # Smooth updates so the spread does not collapse too early
+                        mean[d] = 0.7 * new_mean + 0.3 * mean[d]
+                        spread[d] = 0.7 * math.sqrt(variance) + 0.3 * spread[d]
+
+                if verbose:
+                    total = sum(loss for loss, _ in best.values())
+                    print(f"Generation {generation + 1}/{generations}: best loss {total:.4f}")
+
+        if self.cache_file:
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.cache, f)
+
+        return {enemy_type: params_to_curves(params) for enemy_type, (_, params) in best.items()}
+
+
+def load_targets(filename):
+    """Targets file: list of {enemy, class, levels, win_rate, rounds}"""
+    with open(filename, 'r') as f:
+        entries = json.load(f)
+    return {
+        (entry['enemy'], entry['class']): {
+            'levels': entry['levels'], 'win_rate': entry['win_rate'], 'rounds': entry['rounds']
+        }
+        for entry in entries
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune enemy scaling against target win rates")
+    parser.add_argument('--targets', help="JSON file of target curves (defaults to built-in targets)")
+    parser.add_argument('--out', default=SCALING_FILE, help="Where to write the scaling table")
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--population', type=int, default=16)
+    parser.add_argument('--fights', type=int, default=100, help="Fights per target point")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache', default=None, help="JSON file to persist evaluations between runs")
+    args = parser.parse_args()
+
+    targets = load_targets(args.targets) if args.targets else None
+    tuner = ScalingTuner(targets, args.fights, args.population, args.workers, args.seed, args.cache)
+    table = tuner.tune(args.generations)
+    report(table, tuner.curves, args.fights, args.seed)
+
+    with open(args.out, 'w') as f:
+        json.dump(table, f, indent=2)
+    print(f"Scaling table written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()